@@ -0,0 +1,188 @@
+"""
+End-to-end API benchmark on a synthetic dataset.
+
+    python -m benchmarks.api [--words 5000] [--verbs 500] [--sentences 1000] [--iterations 50]
+                             [--json results.json] [--compare previous.json]
+
+A throwaway test database is created and seeded by benchmarks.synthetic, then
+every scenario drives the real URLs through the DRF test client. For each
+scenario the report has p50/p95 latency, queries per request and the peak
+Python memory allocated while serving one request. The response cache is
+cleared before every request so the numbers reflect the database path.
+`--json` writes machine-readable results (tagged with the git commit) and
+`--compare` prints the change against an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spanglish.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    settings.ALLOWED_HOSTS = ['*']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_scenarios(client, rng):
+    """Return `(name, prepare, request)` triples; `prepare` runs untimed before each request."""
+    from dictionary.models import Word, VerbConjugation
+    word_ids = list(Word.objects.values_list('pk', flat=True))
+    forms = list(VerbConjugation.objects.values_list('conjugated_form', flat=True)[:500])
+    words = list(Word.objects.values_list('text', flat=True)[:500])
+    state = {}
+
+    def new_quiz():
+        state['quiz'] = client.post('/quiz/quiz/create_quiz/', {'count': 10}, format='json').json()
+
+    def submit():
+        quiz = state['quiz']
+        answers = [
+            {'question_id': q['id'], 'user_answer': q['correct_answer'] if rng.random() < 0.7 else {'spanish': '?'}}
+            for q in quiz['questions']
+        ]
+        return client.post(f"/quiz/quiz/{quiz['id']}/submit/", {'answers': answers}, format='json')
+
+    return [
+        ('words.list', None, lambda: client.get('/dictionary/words/')),
+        ('words.retrieve', None, lambda: client.get(f'/dictionary/words/{rng.choice(word_ids)}/')),
+        ('verbs.list', None, lambda: client.get('/dictionary/verbs/')),
+        ('sentences.list', None, lambda: client.get('/dictionary/sentences/')),
+        ('translations.list', None, lambda: client.get('/dictionary/translations/')),
+        ('search', None, lambda: client.get('/dictionary/search/', {'q': rng.choice(words)[:4]})),
+        ('verbs.lookup', None, lambda: client.get('/dictionary/verbs/lookup/', {'form': rng.sample(forms, 20)})),
+        ('quiz.list', None, lambda: client.get('/quiz/quiz/')),
+        ('quiz.create_quiz', None, lambda: client.post('/quiz/quiz/create_quiz/', {'count': 10}, format='json')),
+        ('quiz.submit', new_quiz, submit),
+    ]
+
+
+def measure(prepare, request, iterations):
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries = [], []
+    for _ in range(iterations + 1):
+        caches['default'].clear()
+        connection.queries_log.clear()
+        if prepare:
+            prepare()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = request()
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.content[:200]!r}")
+        latencies.append(elapsed)
+        queries.append(len(captured))
+    latencies, queries = latencies[1:], queries[1:]  # the first call warms up
+
+    caches['default'].clear()
+    if prepare:
+        prepare()
+    tracemalloc.start()
+    request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'queries_mean': round(statistics.fmean(queries), 1),
+        'queries_max': max(queries),
+        'peak_memory_kib': round(peak / 1024, 1),
+    }
+
+
+def compare(current, previous):
+    print(f"\nchange vs {previous.get('commit') or 'previous run'}:")
+    for name, stats in current['scenarios'].items():
+        old = previous['scenarios'].get(name)
+        if not old:
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'queries_mean', 'peak_memory_kib'):
+            if old[key]:
+                deltas.append(f"{key} {100 * (stats[key] - old[key]) / old[key]:+.1f}%")
+        print(f"  {name:<20} " + '  '.join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--verbs', type=int, default=500)
+    parser.add_argument('--sentences', type=int, default=1000)
+    parser.add_argument('--languages', type=int, default=2)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--quizzes-per-user', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--compare', help="Results file from an earlier run")
+    args = parser.parse_args()
+
+    setup_django()
+    import random
+    import django
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+    from benchmarks import synthetic
+
+    started = time.perf_counter()
+    dataset = synthetic.seed(
+        words=args.words, verbs=args.verbs, sentences=args.sentences, languages=args.languages,
+        users=args.users, quizzes_per_user=args.quizzes_per_user, random_seed=args.seed,
+    )
+    print(f"seeded {dataset} in {time.perf_counter() - started:.1f}s")
+
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.first())
+    rng = random.Random(args.seed)
+
+    results = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': dataset,
+        'iterations': args.iterations,
+        'scenarios': {},
+    }
+    for name, prepare, request in build_scenarios(client, rng):
+        stats = measure(prepare, request, args.iterations)
+        results['scenarios'][name] = stats
+        print(
+            f"{name:<20} p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  "
+            f"queries {stats['queries_mean']:>5} (max {stats['queries_max']})  peak {stats['peak_memory_kib']} KiB"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == '__main__':
+    main()
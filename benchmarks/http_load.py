@@ -0,0 +1,93 @@
+"""
+HTTP load generator for comparing deployments of the same endpoint.
+
+    python -m benchmarks.http_load \\
+        --target wsgi=http://localhost:8000/dictionary/words/ \\
+        --target asgi=http://localhost:8001/dictionary/async/words/ \\
+        [--concurrency 200] [--requests 5000] [--json out.json]
+
+Each target is hit by `--concurrency` concurrent clients until `--requests`
+responses have been received. Start the WSGI server (e.g. `manage.py runserver`
+or gunicorn) and the ASGI profile from docker-compose.yaml first.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+async def fetch(url):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\nConnection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return int(data.split(b' ', 2)[1])
+
+
+async def load(url, concurrency, total):
+    latencies, errors = [], 0
+    remaining = total
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(url)
+            except OSError:
+                status = None
+            if status != 200:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[max(int(len(latencies) * p) - 1, 0)] * 1000, 2) if latencies else None
+
+    return {
+        'url': url,
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help="label=url")
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.target:
+        label, _, url = target.partition('=')
+        results[label] = asyncio.run(load(url, args.concurrency, args.requests))
+        stats = results[label]
+        print(
+            f"{label:>8}: {stats['requests_per_sec']:>8} req/s  p50 {stats['p50_ms']} ms  "
+            f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms  errors {stats['errors']}"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Single-core throughput of the word, sentence and translation list endpoints.
+
+    python -m benchmarks.list_throughput [--words 5000] [--sentences 1000] [--page-size 200]
+                                         [--seconds 5] [--json results.json]
+
+Each endpoint is requested in a loop on one thread for `--seconds`, with the
+response cache cleared before every request, and the report gives requests per
+second of process CPU time (i.e. per core) for three setups:
+
+- `serializers`: ModelSerializer rows rendered by the stdlib JSON encoder (the old path)
+- `values`: `values()` rows (`DICTIONARY_FAST_LISTS`) rendered by the stdlib encoder
+- `values+orjson`: `values()` rows rendered with orjson (skipped when it is not installed)
+
+Every setup must return the same bytes; the benchmark stops if one does not.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from unittest import mock
+from benchmarks.api import git_commit, setup_django
+
+ENDPOINTS = ['/dictionary/words/', '/dictionary/sentences/', '/dictionary/translations/']
+
+
+def throughput(client, url, seconds):
+    """Requests per CPU second, and the body of the last response."""
+    from django.core.cache import caches
+    caches['default'].clear()
+    client.get(url)  # warm up
+    count = 0
+    started = time.process_time()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        caches['default'].clear()
+        response = client.get(url)
+        count += 1
+    return count / (time.process_time() - started), response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--sentences', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+    from benchmarks import synthetic
+    from spanglish import renderers
+
+    dataset = synthetic.seed(words=args.words, verbs=args.words // 10, sentences=args.sentences, users=1, quizzes_per_user=0)
+    print(f"seeded {dataset}")
+    client = APIClient()
+    orjson = renderers.orjson
+    setups = [('serializers', False, None), ('values', True, None)]
+    if orjson is not None:
+        setups.append(('values+orjson', True, orjson))
+    else:
+        print("orjson is not installed: skipping values+orjson")
+
+    results = {'commit': git_commit(), 'dataset': dataset, 'page_size': args.page_size, 'endpoints': {}}
+    for path in ENDPOINTS:
+        url = f"{path}?page_size={args.page_size}"
+        stats, bodies = {}, set()
+        for name, fast_lists, encoder in setups:
+            with override_settings(DICTIONARY_FAST_LISTS=fast_lists), mock.patch.object(renderers, 'orjson', encoder):
+                stats[name], body = throughput(client, url, args.seconds)
+            bodies.add(body)
+        if len(bodies) != 1:
+            raise SystemExit(f"{path}: the setups returned different responses")
+        results['endpoints'][path] = {name: round(rps, 1) for name, rps in stats.items()}
+        base = stats['serializers']
+        print(f"{path:<28} " + '  '.join(f"{name} {rps:>7.1f} req/s ({rps / base:.2f}x)" for name, rps in stats.items()))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
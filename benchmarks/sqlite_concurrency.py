@@ -0,0 +1,125 @@
+"""
+Read/write concurrency on SQLite with the stock settings vs the production profile.
+
+    python -m benchmarks.sqlite_concurrency [--readers 8] [--writers 4] [--seconds 5] [--json out.json]
+
+Both runs use a fresh database file and the same workload: writer threads run
+short read-then-update transactions (the shape of a quiz submission) while reader
+threads run point lookups. "default" mirrors Django's out-of-the-box SQLite setup
+(rollback journal, deferred transactions, 5 s timeout); "tuned" applies
+`settings.SQLITE_PRAGMAS` and starts write transactions with BEGIN IMMEDIATE.
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from spanglish.settings import SQLITE_PRAGMAS
+
+PROFILES = {
+    'default': {'pragmas': {}, 'begin': 'BEGIN', 'timeout': 5.0},
+    'tuned': {'pragmas': SQLITE_PRAGMAS, 'begin': 'BEGIN IMMEDIATE', 'timeout': 5.0},
+}
+
+ROWS = 10_000
+
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+    for name, value in profile['pragmas'].items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def setup(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, score INTEGER NOT NULL, payload TEXT NOT NULL)")
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO item (score, payload) VALUES (0, ?)", [('x' * 200,)] * ROWS)
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def worker(path, profile, kind, deadline, results):
+    conn = connect(path, profile)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        pk = random.randint(1, ROWS)
+        start = time.perf_counter()
+        try:
+            if kind == 'write':
+                conn.execute(profile['begin'])
+                (score,) = conn.execute("SELECT score FROM item WHERE id = ?", (pk,)).fetchone()
+                conn.execute("UPDATE item SET score = ? WHERE id = ?", (score + 1, pk))
+                conn.execute("COMMIT")
+            else:
+                conn.execute("SELECT score, payload FROM item WHERE id = ?", (pk,)).fetchone()
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.append((kind, latencies, errors))
+
+
+def run(profile_name, readers, writers, seconds):
+    profile = PROFILES[profile_name]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'bench.sqlite3')
+        setup(path)
+        # journal_mode is persistent, so set it once before the workers connect
+        connect(path, profile).close()
+
+        results = []
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=worker, args=(path, profile, kind, deadline, results))
+            for kind in ['read'] * readers + ['write'] * writers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    summary = {'profile': profile_name}
+    for kind in ('read', 'write'):
+        latencies = sorted(lat for k, lats, _ in results if k == kind for lat in lats)
+        errors = sum(err for k, _, err in results if k == kind)
+        summary[kind] = {
+            'ops_per_sec': round(len(latencies) / seconds, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3) if latencies else None,
+            'locked_errors': errors,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    summaries = [run(name, args.readers, args.writers, args.seconds) for name in PROFILES]
+    for summary in summaries:
+        for kind in ('read', 'write'):
+            stats = summary[kind]
+            print(
+                f"{summary['profile']:>8} {kind:>5}: {stats['ops_per_sec']:>10} ops/s  "
+                f"p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  locked {stats['locked_errors']}"
+            )
+    if args.json:
+        Path(args.json).write_text(json.dumps(summaries, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Synthetic dictionary and quiz-history generator for benchmarks.
+
+Requires a configured Django project (see benchmarks.api); all rows are written
+with batched bulk_create calls, so large datasets seed in seconds.
+"""
+import random
+from datetime import timedelta
+from itertools import batched
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from dictionary import search
+from dictionary.models import (
+    Category, Sentence, Translation, Verb, VerbConjugation, VerbPerson, VerbTense, Word, WordCategory, fold_text,
+)
+from quiz.models import Quiz, QuizQuestion
+
+SYLLABLES = ['ca', 'me', 'lo', 'sa', 'ti', 'ño', 'rá', 'pe', 'du', 'go', 'bri', 'cí', 'ne', 'ta', 'vo', 'mú']
+ENDINGS = ['ar', 'er', 'ir']
+LANGUAGES = ['en', 'fr', 'de', 'nl']
+BATCH_SIZE = 2000
+
+
+def make_word(rng, suffix=''):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + suffix
+
+
+def bulk_create(model, objs):
+    """bulk_create in fixed-size batches, keeping each INSERT within the backend's parameter limits."""
+    created = []
+    for batch in batched(objs, BATCH_SIZE):
+        created.extend(model.objects.bulk_create(batch))
+    return created
+
+
+def seed(words=5000, verbs=500, sentences=1000, languages=2, categories=20,
+         users=10, quizzes_per_user=10, questions_per_quiz=10, random_seed=0):
+    """Populate the current database and return the row counts that were created."""
+    rng = random.Random(random_seed)
+    languages = LANGUAGES[:languages]
+    nouns = [WordCategory.NOUN, WordCategory.ADJECTIVE, WordCategory.ADVERB, WordCategory.PRONOUN]
+
+    category_objs = bulk_create(Category, (Category(name=f'category-{i}') for i in range(categories)))
+    word_objs = bulk_create(Word, (
+        Word(text=make_word(rng, rng.choice(ENDINGS)), category=WordCategory.VERB) if i < verbs
+        else Word(text=make_word(rng), category=rng.choice(nouns))
+        for i in range(words)
+    ))
+    Link = Word.categories.through
+    bulk_create(Link, (
+        Link(word_id=word.pk, category_id=category.pk)
+        for word in word_objs
+        for category in rng.sample(category_objs, min(2, len(category_objs)))
+    ))
+
+    verb_objs = bulk_create(Verb, (Verb(word=word) for word in word_objs[:verbs]))
+    conjugations = bulk_create(VerbConjugation, (
+        VerbConjugation(verb=verb, tense=tense, person=person, conjugated_form=form, normalized_form=fold_text(form))
+        for verb in verb_objs
+        for tense in VerbTense.values
+        for person in VerbPerson.values
+        for form in [f'{verb.word.text[:-2]}{tense[:2]}{person}']
+    ))
+
+    sentence_objs = bulk_create(Sentence, (
+        Sentence(text=' '.join(make_word(rng) for _ in range(rng.randint(4, 10))).capitalize() + '.')
+        for _ in range(sentences)
+    ))
+    content_types = ContentType.objects.get_for_models(Word, Sentence)
+    word_ct, sentence_ct = content_types[Word], content_types[Sentence]
+    translations = bulk_create(Translation, (
+        Translation(content_type=ct, object_id=obj.pk, language=language, text=f'{language}-{make_word(rng)}')
+        for ct, objs in ((word_ct, word_objs), (sentence_ct, sentence_objs))
+        for obj in objs
+        for language in languages
+    ))
+    search.rebuild()
+
+    User = get_user_model()
+    user_objs = bulk_create(User, (User(username=f'learner{i}') for i in range(users)))
+    now = timezone.now()
+    quiz_objs = bulk_create(Quiz, (
+        Quiz(user=user, total_questions=questions_per_quiz, created_at=now - timedelta(days=day), submitted_at=now)
+        for user in user_objs
+        for day in range(quizzes_per_user)
+    ))
+    questions = bulk_create(QuizQuestion, (
+        QuizQuestion(
+            quiz=quiz, content_type=word_ct, object_id=word.pk,
+            correct_answer={'spanish': word.text}, user_answer={'spanish': word.text},
+            is_correct=rng.random() < 0.7, answered_at=now,
+        )
+        for quiz in quiz_objs
+        for word in rng.sample(word_objs, min(questions_per_quiz, len(word_objs)))
+    ))
+
+    return {
+        'categories': len(category_objs),
+        'words': len(word_objs),
+        'verbs': len(verb_objs),
+        'conjugations': len(conjugations),
+        'sentences': len(sentence_objs),
+        'translations': len(translations),
+        'users': len(user_objs),
+        'quizzes': len(quiz_objs),
+        'quiz_questions': len(questions),
+    }
@@ -1,6 +1,34 @@
 from django.contrib import admin
-from .models import Word, Sentence, Translation, Verb, VerbConjugation, Category
+from django.db.models import Q
+from spanglish.admin import ScalableModelAdmin
+from .models import Word, Sentence, Translation, Verb, VerbConjugation, Category, fold_text
 from django.contrib.contenttypes.admin import GenericTabularInline
+from . import search
+
+
+class FullTextSearchMixin:
+    """
+    Answer admin searches (and the autocomplete widgets built on them) from the
+    full-text index: `fts_search` maps a lookup to the search kind whose ids it
+    holds, e.g. {'pk': 'word'} or {'verb__word': 'word'}. Terms match as accent-
+    insensitive word prefixes. On databases without the index, `search_fields`
+    are used as usual.
+    """
+    fts_search = {}
+
+    def search_lookup(self, search_term):
+        lookup = Q()
+        for field, kind in self.fts_search.items():
+            lookup |= Q(**{f'{field}__in': search.matching(kind, search_term)})
+        return lookup
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not search.is_supported(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        if not search.build_match(search_term):
+            return queryset.none(), False
+        return queryset.filter(self.search_lookup(search_term)), False
+
 
 class TranslationInline(GenericTabularInline):
     model = Translation
@@ -13,35 +41,53 @@ class CategoryAdmin(admin.ModelAdmin):
     ordering = ('name',)
 
 @admin.register(Word)
-class WordAdmin(admin.ModelAdmin):
+class WordAdmin(FullTextSearchMixin, ScalableModelAdmin):
     list_display = ('text', 'category')
     list_filter = ('category',)
     search_fields = ('text',)
+    fts_search = {'pk': 'word'}
+    autocomplete_fields = ('categories',)
 
     inlines = [TranslationInline]
 
 @admin.register(Sentence)
-class SentenceAdmin(admin.ModelAdmin):
+class SentenceAdmin(FullTextSearchMixin, ScalableModelAdmin):
     list_display = ('text',)
     search_fields = ('text',)
+    fts_search = {'pk': 'sentence'}
+    autocomplete_fields = ('related_words',)
 
 @admin.register(Translation)
-class TranslationAdmin(admin.ModelAdmin):
+class TranslationAdmin(FullTextSearchMixin, ScalableModelAdmin):
     list_display = ('get_related_object', 'text', 'language')
     list_filter = ('language',)
-    search_fields = ('text', 'text')
+    search_fields = ('text',)
+    fts_search = {'pk': 'translation'}
+    # One query per content type for the whole page
+    prefetch_generic = ('content_object',)
 
     def get_related_object(self, obj):
         return str(obj.content_object)  # calls __str__ of the related object
-    
+
     get_related_object.short_description = 'Word/Sentence'
 
 @admin.register(Verb)
-class VerbAdmin(admin.ModelAdmin):
+class VerbAdmin(FullTextSearchMixin, ScalableModelAdmin):
     list_display = ('word',)
-    search_fields = ('word',)
+    list_select_related = ('word',)
+    search_fields = ('word__text',)
+    fts_search = {'word': 'word'}
+    autocomplete_fields = ('word',)
 
 @admin.register(VerbConjugation)
-class ConjunctionAdmin(admin.ModelAdmin):
+class ConjunctionAdmin(FullTextSearchMixin, ScalableModelAdmin):
     list_display = ('verb', 'tense', 'person', 'conjugated_form')
-    search_fields = ('verb',)
+    list_filter = ('tense', 'person')
+    list_select_related = ('verb__word',)
+    search_fields = ('conjugated_form', 'verb__word__text')
+    fts_search = {'verb__word': 'word'}
+    autocomplete_fields = ('verb',)
+
+    def search_lookup(self, search_term):
+        # A conjugated form is found through the normalized_form index
+        return super().search_lookup(search_term) | Q(normalized_form=fold_text(search_term))
@@ -0,0 +1,97 @@
+"""
+Async read-only endpoints for the dictionary, meant for ASGI deployments.
+
+They return the same objects as the DRF viewsets (the same serializers render
+them) but load data with Django's async ORM, so a slow client never holds a
+worker thread while the database is queried. Lists are keyset-paginated with
+`?after=<id>&page_size=<n>`.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import JsonResponse
+from django.views import View
+from .models import Category, Word, Verb, Sentence, Translation
+from .serializers import WordSerializer, VerbSerializer, SentenceSerializer, TranslationSerializer
+from .views import related_prefetch, translations_prefetch
+
+# Match the compact UTF-8 output of DRF's JSONRenderer
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+class AsyncReadView(View):
+    queryset = None
+    serializer_class = None
+
+    async def get_queryset(self, request):
+        assert self.queryset is not None, (
+            f"'{self.__class__.__name__}' should either include a `queryset` attribute, "
+            "or override the `get_queryset()` method."
+        )
+        # .all() so the class-level queryset's result cache is never shared between requests
+        return self.queryset.all()
+
+    def error(self, detail, status):
+        return JsonResponse({'detail': detail}, status=status, json_dumps_params=JSON_PARAMS)
+
+    async def get(self, request, pk=None):
+        queryset = await self.get_queryset(request)
+        model = queryset.model
+        if pk is not None:
+            try:
+                obj = await queryset.aget(pk=pk)
+            except model.DoesNotExist:
+                return self.error(f"No {model.__name__} matches the given query.", status=404)
+            return JsonResponse(self.serializer_class(obj).data, json_dumps_params=JSON_PARAMS)
+
+        try:
+            after = int(request.GET.get('after', 0))
+            page_size = int(request.GET.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            return self.error("'after' and 'page_size' must be integers.", status=400)
+        page_size = max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+        # Fetch one extra row to know whether there is a next page
+        rows = queryset.filter(pk__gt=after).order_by('pk')[:page_size + 1]
+        objs = [obj async for obj in rows.aiterator(chunk_size=page_size + 1)]
+        next_url = None
+        if len(objs) > page_size:
+            objs = objs[:page_size]
+            params = request.GET.copy()
+            params['after'] = objs[-1].pk
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        return JsonResponse(
+            {'next': next_url, 'previous': None, 'results': self.serializer_class(objs, many=True).data},
+            json_dumps_params=JSON_PARAMS,
+        )
+
+
+class WordAsyncView(AsyncReadView):
+    queryset = Word.objects.prefetch_related(translations_prefetch(), related_prefetch('categories', Category))
+    serializer_class = WordSerializer
+
+
+class VerbAsyncView(AsyncReadView):
+    queryset = Verb.objects.select_related('word').prefetch_related('conjugations')
+    serializer_class = VerbSerializer
+
+
+class SentenceAsyncView(AsyncReadView):
+    queryset = Sentence.objects.prefetch_related(translations_prefetch(), related_prefetch('related_words', Word))
+    serializer_class = SentenceSerializer
+
+
+class TranslationAsyncView(AsyncReadView):
+    queryset = Translation.objects.select_related('content_type')
+    serializer_class = TranslationSerializer
+
+    async def get_queryset(self, request):
+        queryset = await super().get_queryset(request)
+        content_type_param = request.GET.get('content_type')
+        object_id_param = request.GET.get('object_id')
+        if content_type_param and object_id_param:
+            try:
+                content_type = await ContentType.objects.aget(model=content_type_param.lower())
+                queryset = queryset.filter(content_type=content_type, object_id=object_id_param)
+            except ContentType.DoesNotExist:
+                queryset = queryset.none()
+        return queryset
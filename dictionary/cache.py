@@ -0,0 +1,101 @@
+"""
+Versioned response cache for the dictionary read endpoints.
+
+Each model has a version stamp (a nanosecond timestamp) stored in the cache
+backend named by `settings.DICTIONARY_CACHE_ALIAS`, which must be shared by
+every server process (not LocMemCache), or a worker that missed a bump keeps
+serving stale bodies and 304s. Signal handlers and bulk
+writers call `bump()` after a change commits; views combine the stamps of the
+models they depend on with the request URL into a token that keys the cached
+response body and doubles as its ETag. An unknown stamp (e.g. after eviction)
+is simply re-created, which invalidates the entries built on it.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from spanglish import routers
+
+
+def get_cache():
+    return caches[getattr(settings, 'DICTIONARY_CACHE_ALIAS', 'default')]
+
+
+def version_key(model):
+    return f"dictionary:version:{model._meta.label_lower}"
+
+
+def bump(*models, using='default'):
+    """Give the models a new version once the current transaction commits."""
+    def set_versions():
+        now = time.time_ns()
+        get_cache().set_many({version_key(model): now for model in models}, timeout=None)
+    transaction.on_commit(set_versions, using=using)
+
+
+def versions(*models):
+    """Return the current version stamp of each model, creating missing ones."""
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+class CachedReadMixin:
+    """
+    Serve `list` and `retrieve` from the versioned cache, with ETag/Last-Modified
+    headers and 304 answers to matching `If-None-Match`/`If-Modified-Since` requests.
+    A conditional hit never touches the database.
+    """
+    # Models whose changes can alter this endpoint's output
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs):
+        stamps = versions(*self.cache_dependencies)
+        token = hashlib.sha1(f"{request.build_absolute_uri()}|{stamps}".encode()).hexdigest()
+        etag = quote_etag(token)
+        last_modified = max(stamps) // 1_000_000_000
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_none_match is not None:
+            not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        else:
+            not_modified = if_modified_since is not None and last_modified <= if_modified_since
+
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = get_cache()
+            key = f"dictionary:response:{token}"
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                # A request pinned to the primary has written, so its body may not match
+                # the stamps read above; it is served but not stored
+                if not routers.is_pinned():
+                    cache.set(key, response.data, getattr(settings, 'DICTIONARY_CACHE_TIMEOUT', 3600))
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,59 @@
+"""
+Change log behind the incremental sync endpoint (/dictionary/changes/).
+
+Every write to a dictionary model appends a `ChangeLog` entry (model, id,
+insert/update/delete) with a growing sequence number: model signals cover
+single-object saves and deletes, and the bulk write paths call
+`record_changes()` themselves. An object keeps only its latest entry, so the
+log holds at most one row per object and a client that was offline for months
+downloads each changed object once. Clients apply inserts and updates as
+upserts, and read the log from the `seq` of their offline pack onwards.
+"""
+from collections import defaultdict
+from . import export
+from .models import Category, ChangeLog, Sentence, Translation, Verb, VerbConjugation, Word
+
+TRACKED_MODELS = (Category, Word, Verb, VerbConjugation, Sentence, Translation)
+MODELS = {model._meta.model_name: model for model in TRACKED_MODELS}
+
+
+def record_changes(model, ids, action, using='default'):
+    """Log `action` for the objects with the given ids and drop their superseded entries."""
+    ids = set(ids)
+    if not ids:
+        return
+    name = model._meta.model_name
+    entries = ChangeLog.objects.using(using).bulk_create(
+        ChangeLog(model=name, object_id=pk, action=action) for pk in ids
+    )
+    # Delete after inserting, so that outside a transaction there is no moment when
+    # the objects have no entry at all; readers may briefly see both instead.
+    ChangeLog.objects.using(using).filter(
+        model=name, object_id__in=ids, seq__lt=min(entry.seq for entry in entries),
+    ).delete()
+
+
+def changes_since(since, limit):
+    """
+    Up to `limit` changes after `since`, oldest first, with the current record of
+    each inserted or updated object. Returns `(changes, has_more)`.
+    """
+    entries = list(ChangeLog.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    wanted = defaultdict(list)
+    for entry in entries:
+        if entry.action != ChangeLog.Action.DELETE:
+            wanted[entry.model].append(entry.object_id)
+    current = {name: export.records_for(MODELS[name], ids) for name, ids in wanted.items()}
+
+    changes = []
+    for entry in entries:
+        record = current.get(entry.model, {}).get(entry.object_id)
+        # An object deleted after its entry was read is reported as deleted
+        action = entry.action if record is not None else ChangeLog.Action.DELETE
+        changes.append({
+            'seq': entry.seq, 'action': action, 'model': entry.model, 'id': entry.object_id, 'object': record,
+        })
+    return changes, has_more
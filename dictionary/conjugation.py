@@ -0,0 +1,157 @@
+"""
+Rule-based conjugation of regular Spanish -ar/-er/-ir verbs.
+
+Regular forms are derived from the infinitive in `Word.text`. Once a verb's
+complete table has been checked against the rules (`Verb.derive_regular`), only
+the forms that differ from them (irregular and stem-changing verbs, accent
+shifts like envío) are stored as `VerbConjugation` rows. Verbs without the flag
+keep exactly the forms they were given, since a partial table of an irregular
+verb says nothing about its missing forms. Spelling adjustments that
+keep the sound of the stem (busqué, llegué, empecé, cojo) count as regular.
+The ambiguous 'past' tense is never computed; its forms are always stored.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from .models import VerbPerson, VerbTense, fold_text
+
+P = VerbPerson
+T = VerbTense
+PERSONS = [P.FIRST_SINGULAR, P.SECOND_SINGULAR, P.THIRD_SINGULAR, P.FIRST_PLURAL, P.SECOND_PLURAL, P.THIRD_PLURAL]
+
+# Endings added to the stem (infinitive minus -ar/-er/-ir), per verb class and tense
+STEM_ENDINGS = {
+    'ar': {
+        T.PRESENT: ['o', 'as', 'a', 'amos', 'áis', 'an'],
+        T.PRETERITE: ['é', 'aste', 'ó', 'amos', 'asteis', 'aron'],
+        T.IMPERFECT: ['aba', 'abas', 'aba', 'ábamos', 'abais', 'aban'],
+        T.SUBJUNCTIVE: ['e', 'es', 'e', 'emos', 'éis', 'en'],
+    },
+    'er': {
+        T.PRESENT: ['o', 'es', 'e', 'emos', 'éis', 'en'],
+        T.PRETERITE: ['í', 'iste', 'ió', 'imos', 'isteis', 'ieron'],
+        T.IMPERFECT: ['ía', 'ías', 'ía', 'íamos', 'íais', 'ían'],
+        T.SUBJUNCTIVE: ['a', 'as', 'a', 'amos', 'áis', 'an'],
+    },
+    'ir': {
+        T.PRESENT: ['o', 'es', 'e', 'imos', 'ís', 'en'],
+        T.PRETERITE: ['í', 'iste', 'ió', 'imos', 'isteis', 'ieron'],
+        T.IMPERFECT: ['ía', 'ías', 'ía', 'íamos', 'íais', 'ían'],
+        T.SUBJUNCTIVE: ['a', 'as', 'a', 'amos', 'áis', 'an'],
+    },
+}
+# Endings added to the whole infinitive, the same for every class
+INFINITIVE_ENDINGS = {
+    T.FUTURE: ['é', 'ás', 'á', 'emos', 'éis', 'án'],
+    T.CONDITIONAL: ['ía', 'ías', 'ía', 'íamos', 'íais', 'ían'],
+}
+TENSE_ORDER = {tense: index for index, tense in enumerate(VerbTense.values)}
+PERSON_ORDER = {person: index for index, person in enumerate(VerbPerson.values)}
+
+# Stem spelling changes: (verb class, stem suffix, vowels of the ending that trigger it, replacement)
+SPELLING = [
+    ('ar', 'c', 'eé', 'qu'),   # buscar -> busqué
+    ('ar', 'g', 'eé', 'gu'),   # llegar -> llegué
+    ('ar', 'z', 'eé', 'c'),    # empezar -> empecé
+    ('er', 'g', 'ao', 'j'),    # coger -> cojo
+    ('ir', 'g', 'ao', 'j'),    # dirigir -> dirijo
+]
+# The reverse of SPELLING, used to recover infinitives from spelled stems
+UNSPELLING = {replacement: suffix for _, suffix, _, replacement in SPELLING}
+
+
+def verb_class(infinitive):
+    """'ar', 'er' or 'ir' for a plain infinitive, None for anything the rules don't cover."""
+    if len(infinitive) > 2 and infinitive.isalpha() and infinitive.islower() and infinitive[-2:] in STEM_ENDINGS:
+        return infinitive[-2:]
+    return None
+
+
+def spell(stem, ending, cls):
+    for rule_class, suffix, vowels, replacement in SPELLING:
+        if cls == rule_class and stem.endswith(suffix) and ending[0] in vowels:
+            return stem[:-len(suffix)] + replacement
+    return stem
+
+
+def regular_form(infinitive, tense, person):
+    """One regular form, or None if the rules don't cover the verb or the tense."""
+    cls = verb_class(infinitive)
+    if cls is None or person not in PERSONS:
+        return None
+    index = PERSONS.index(person)
+    if tense in INFINITIVE_ENDINGS:
+        return infinitive + INFINITIVE_ENDINGS[tense][index]
+    if tense in STEM_ENDINGS[cls]:
+        ending = STEM_ENDINGS[cls][tense][index]
+        return spell(infinitive[:-2], ending, cls) + ending
+    return None
+
+
+@lru_cache(maxsize=4096)
+def regular_forms(infinitive):
+    """{(tense, person): form} of a regular verb, memoized; empty for infinitives the rules don't cover."""
+    if verb_class(infinitive) is None:
+        return MappingProxyType({})
+    tenses = [*STEM_ENDINGS[verb_class(infinitive)], *INFINITIVE_ENDINGS]
+    return MappingProxyType({
+        (tense, person): regular_form(infinitive, tense, person) for tense in tenses for person in PERSONS
+    })
+
+
+def is_complete(infinitive, table):
+    """Whether `table` ({(tense, person): form}) has a form for every slot the rules compute."""
+    forms = regular_forms(infinitive)
+    return bool(forms) and forms.keys() <= table.keys()
+
+
+def merge(infinitive, stored):
+    """
+    The full conjugation table of a `derive_regular` verb: `stored` conjugations (dicts
+    with tense and person) plus the computed regular forms they don't override, in
+    tense/person order.
+    """
+    table = {(c['tense'], c['person']): c for c in stored}
+    for (tense, person), form in regular_forms(infinitive).items():
+        if (tense, person) not in table:
+            table[(tense, person)] = {'id': None, 'tense': tense, 'person': person, 'conjugated_form': form}
+    return [
+        table[key] for key in sorted(
+            table, key=lambda key: (TENSE_ORDER.get(key[0], len(TENSE_ORDER)), PERSON_ORDER.get(key[1], len(PERSON_ORDER)))
+        )
+    ]
+
+
+def is_regular(infinitive, tense, person, form):
+    return regular_forms(infinitive).get((tense, person)) == form
+
+
+def analyze(form):
+    """
+    Infinitives whose regular conjugation produces `form` (accent- and case-insensitive),
+    as a set of `(infinitive, tense, person)`. Candidates are confirmed by conjugating them.
+    """
+    folded = fold_text(form)
+    # Stems keep their ñ/ü only in the unfolded spelling, so strip endings from both
+    spellings = {form.strip().lower(), folded}
+    candidates = set()
+    for word in spellings:
+        for cls, tenses in STEM_ENDINGS.items():
+            for tense, endings in tenses.items():
+                for person, ending in zip(PERSONS, endings):
+                    # The ending as written and without its accent (hablo, hablé, hable)
+                    for suffix in {ending, fold_text(ending)}:
+                        if word.endswith(suffix) and len(word) > len(suffix):
+                            stem = word[:-len(suffix)]
+                            candidates.add((stem + cls, tense, person))
+                            for replacement, original in UNSPELLING.items():
+                                if stem.endswith(replacement):
+                                    candidates.add((stem[:-len(replacement)] + original + cls, tense, person))
+        for tense, endings in INFINITIVE_ENDINGS.items():
+            for person, ending in zip(PERSONS, endings):
+                for suffix in {ending, fold_text(ending)}:
+                    if word.endswith(suffix):
+                        candidates.add((word[:-len(suffix)], tense, person))
+    return {
+        (infinitive, tense, person) for infinitive, tense, person in candidates
+        if fold_text(regular_form(infinitive, tense, person) or '') == folded
+    }
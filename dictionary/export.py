@@ -0,0 +1,259 @@
+"""
+Offline pack of the whole dictionary, as gzip-compressed NDJSON.
+
+Every line is one JSON object with a "type": a header line with the content
+version (see `content_version()`), then every category, word (with its category
+ids and translations), verb (with its conjugations) and sentence (with its
+related word ids and translations). Tables are read in keyset-paginated chunks of plain tuples and
+compressed as they are read, so memory stays bounded however large the
+dictionary is.
+
+A pack is read from the primary in a single read transaction, and labelled
+with the content version of that snapshot. Packs are cached in
+`settings.DICTIONARY_EXPORT_DIR`, named after that version, so repeat downloads
+are plain file sends until the data changes.
+"""
+import json
+import os
+import tempfile
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from spanglish import routers
+from . import conjugation
+from .models import Category, ChangeLog, Word, Translation, Verb, VerbConjugation, Sentence
+
+CONTENT_TYPE = 'application/gzip'
+CHUNK_SIZE = 2000
+# Compressed output is handed out in blocks of about this many bytes
+BLOCK_SIZE = 64 * 1024
+
+
+def content_version():
+    """
+    Identifier of the current dictionary content: the latest change log sequence
+    number. A pack of this version plus /changes/?since=<version> is up to date.
+    """
+    return str(ChangeLog.objects.aggregate(seq=Max('seq'))['seq'] or 0)
+
+
+def export_dir():
+    return Path(getattr(settings, 'DICTIONARY_EXPORT_DIR', settings.BASE_DIR / 'exports'))
+
+
+def pack_path(version):
+    return export_dir() / f"dictionary-{version}.ndjson.gz"
+
+
+def pack_version(path):
+    """The content version in a pack's file name, or None for other files."""
+    version = path.name.removeprefix('dictionary-').removesuffix('.ndjson.gz')
+    return int(version) if version.isdigit() else None
+
+
+@contextmanager
+def snapshot(using='default'):
+    """
+    Run the reads in the block in one read-only transaction, so they all see the
+    data as of the first one. SQLite in WAL mode gives a DEFERRED transaction a
+    stable snapshot without taking the write lock (atomic() would BEGIN IMMEDIATE);
+    PostgreSQL needs REPEATABLE READ. Inside an existing transaction the block
+    simply joins it.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block:
+        yield
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("BEGIN DEFERRED")
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("COMMIT")
+    else:
+        with transaction.atomic(using=using):
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            yield
+
+
+def chunks(queryset, *fields):
+    """Yield the rows of `queryset` as `(pk, *fields)` tuples, CHUNK_SIZE at a time in pk order."""
+    last = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last).order_by('pk').values_list('pk', *fields)[:CHUNK_SIZE])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def grouped(queryset, key, *fields):
+    """Map each value of `key` to the list of `fields` tuples of its rows."""
+    groups = defaultdict(list)
+    for key_value, *values in queryset.order_by('pk').values_list(key, *fields):
+        groups[key_value].append(values)
+    return groups
+
+
+def translations_of(model, ids):
+    content_type = ContentType.objects.get_for_model(model)
+    rows = Translation.objects.filter(content_type=content_type, object_id__in=ids)
+    return {
+        pk: [{'id': id, 'language': language, 'text': text} for id, language, text in group]
+        for pk, group in grouped(rows, 'object_id', 'id', 'language', 'text').items()
+    }
+
+
+def category_records(rows):
+    for pk, name, description in rows:
+        yield {'type': 'category', 'id': pk, 'name': name, 'description': description}
+
+
+def word_records(rows):
+    ids = [row[0] for row in rows]
+    categories = grouped(Word.categories.through.objects.filter(word_id__in=ids), 'word_id', 'category_id')
+    translations = translations_of(Word, ids)
+    for pk, text, category in rows:
+        yield {
+            'type': 'word', 'id': pk, 'text': text, 'category': category,
+            'categories': [c for c, in categories.get(pk, ())], 'translations': translations.get(pk, []),
+        }
+
+
+def verb_records(rows):
+    stored = grouped(
+        VerbConjugation.objects.filter(verb_id__in=[row[0] for row in rows]),
+        'verb_id', 'id', 'tense', 'person', 'conjugated_form',
+    )
+    for pk, word_id, infinitive, derive_regular in rows:
+        conjugations = [
+            {'id': id, 'tense': tense, 'person': person, 'conjugated_form': form}
+            for id, tense, person, form in stored.get(pk, ())
+        ]
+        if derive_regular:
+            conjugations = conjugation.merge(infinitive, conjugations)
+        yield {'type': 'verb', 'id': pk, 'word': word_id, 'conjugations': conjugations}
+
+
+def sentence_records(rows):
+    ids = [row[0] for row in rows]
+    related = grouped(Sentence.related_words.through.objects.filter(sentence_id__in=ids), 'sentence_id', 'word_id')
+    translations = translations_of(Sentence, ids)
+    for pk, text in rows:
+        yield {
+            'type': 'sentence', 'id': pk, 'text': text,
+            'related_words': [w for w, in related.get(pk, ())], 'translations': translations.get(pk, []),
+        }
+
+
+def translation_records(rows):
+    for pk, language, text, content_type, object_id in rows:
+        yield {
+            'type': 'translation', 'id': pk, 'language': language, 'text': text,
+            'content_type': content_type, 'object_id': object_id,
+        }
+
+
+def conjugation_records(rows):
+    for pk, verb_id, tense, person, form in rows:
+        yield {'type': 'conjugation', 'id': pk, 'verb': verb_id, 'tense': tense, 'person': person, 'conjugated_form': form}
+
+
+# model -> (fields read for each row, record builder). Translations and conjugations are
+# nested in their word/sentence/verb in the pack; the change feed also sends them alone.
+RECORDS = {
+    Category: (('name', 'description'), category_records),
+    Word: (('text', 'category'), word_records),
+    Verb: (('word_id', 'word__text', 'derive_regular'), verb_records),
+    Sentence: (('text',), sentence_records),
+    Translation: (('language', 'text', 'content_type__model', 'object_id'), translation_records),
+    VerbConjugation: (('verb_id', 'tense', 'person', 'conjugated_form'), conjugation_records),
+}
+PACKED_MODELS = (Category, Word, Verb, Sentence)
+
+
+def records(version):
+    """
+    Every exported object as a dict. Related rows are read with one query per
+    chunk and per relation, straight into tuples, which keeps the export far
+    cheaper than ORM instances with prefetches.
+    """
+    yield {'type': 'header', 'version': version, 'created_at': timezone.now().isoformat()}
+    for model in PACKED_MODELS:
+        fields, build = RECORDS[model]
+        for rows in chunks(model.objects.all(), *fields):
+            yield from build(rows)
+
+
+def records_for(model, ids):
+    """The current record of each of the given objects that still exists, keyed by pk."""
+    fields, build = RECORDS[model]
+    rows = list(model.objects.filter(pk__in=ids).order_by('pk').values_list('pk', *fields))
+    return {record['id']: record for record in build(rows)}
+
+
+def compressed(items):
+    """Encode `items` as NDJSON and gzip it, yielding blocks of compressed bytes."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    block = []
+    size = 0
+    for item in items:
+        data = compressor.compress(json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode() + b'\n')
+        if data:
+            block.append(data)
+            size += len(data)
+            if size >= BLOCK_SIZE:
+                yield b''.join(block)
+                block, size = [], 0
+    block.append(compressor.flush())
+    yield b''.join(block)
+
+
+def stream_pack():
+    """
+    Generate the current pack, yielding it while it is written to the export
+    directory, and return its path. The file only takes its final name once it is
+    complete; packs of older versions are then removed (never newer ones, which a
+    concurrent build may have published meanwhile).
+    """
+    directory = export_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f, routers.primary(), snapshot():
+            version = content_version()
+            for block in compressed(records(version)):
+                f.write(block)
+                yield block
+        path = pack_path(version)
+        os.replace(tmp, path)
+    except BaseException:  # includes GeneratorExit when a client disconnects
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    for old in directory.glob('dictionary-*.ndjson.gz'):
+        old_version = pack_version(old)
+        if old_version is not None and old_version < int(version):
+            old.unlink(missing_ok=True)
+    return path
+
+
+def build_pack():
+    """Write the current pack to disk if it is not there yet, and return its path."""
+    path = pack_path(content_version())
+    if path.exists():
+        return path
+    blocks = stream_pack()
+    try:
+        while True:
+            next(blocks)
+    except StopIteration as done:
+        return done.value
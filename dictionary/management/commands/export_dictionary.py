@@ -0,0 +1,19 @@
+import shutil
+
+from django.core.management.base import BaseCommand
+
+from dictionary import export
+
+
+class Command(BaseCommand):
+    help = "Build the offline dictionary pack (gzip-compressed NDJSON) served by /dictionary/export/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Also copy the pack to this path")
+
+    def handle(self, *args, **options):
+        path = export.build_pack()
+        if options['output']:
+            shutil.copyfile(path, options['output'])
+            path = options['output']
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
@@ -0,0 +1,301 @@
+import csv
+import json
+from collections import Counter
+from itertools import batched
+from pathlib import Path
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from dictionary import cache, changes, conjugation, search
+from dictionary.models import (
+    Category, ChangeLog, Translation, Verb, VerbConjugation, VerbPerson, VerbTense, Word, WordCategory, fold_text,
+)
+
+
+class RecordError(ValueError):
+    pass
+
+
+def string(value, what):
+    """`value` stripped, or a RecordError if it is not a string."""
+    if not isinstance(value, str):
+        raise RecordError(f"{what} must be a string, not {type(value).__name__}")
+    return value.strip()
+
+
+def parse_record(raw):
+    """
+    Normalize one CSV/JSONL record into plain Python values.
+
+    JSONL records look like
+        {"text": "hablar", "category": "verb", "categories": ["basics"],
+         "translations": {"en": "to speak"}, "conjugations": {"present": {"1s": "hablo"}}}
+    `translations` may also be a list of {"language", "text"} objects and `conjugations`
+    a list of {"tense", "person", "conjugated_form"} objects. In CSV files `categories`
+    is `;`-separated, `translations` is `;`-separated `language:text` pairs (a bare
+    text means English) and `conjugations` holds the same JSON as in JSONL.
+    Any value of the wrong shape raises RecordError.
+    """
+    if not isinstance(raw, dict):
+        raise RecordError("record is not an object")
+    text = string(raw.get('text') or '', "'text'")
+    if not text or len(text) > Word._meta.get_field('text').max_length:
+        raise RecordError(f"invalid text {text!r}")
+    category = string(raw.get('category') or '', "'category'").lower()
+    if category not in WordCategory.values:
+        raise RecordError(f"invalid category {category!r}")
+
+    categories = raw.get('categories') or []
+    if isinstance(categories, str):
+        categories = categories.split(';')
+    if not isinstance(categories, list):
+        raise RecordError("'categories' must be a list or a ';'-separated string")
+    categories = [name for name in (string(name, "a category") for name in categories) if name]
+
+    translations = raw.get('translations') or []
+    if isinstance(translations, str):
+        pairs = []
+        for item in translations.split(';'):
+            language, sep, value = item.partition(':')
+            pairs.append((language, value) if sep else ('en', language))
+        translations = pairs
+    elif isinstance(translations, dict):
+        translations = list(translations.items())
+    elif isinstance(translations, list):
+        if not all(isinstance(item, dict) for item in translations):
+            raise RecordError("'translations' list items must be {\"language\", \"text\"} objects")
+        translations = [(item.get('language', 'en'), item.get('text', '')) for item in translations]
+    else:
+        raise RecordError("'translations' must be an object, a list or a string")
+    translations = [
+        (string(language, "a translation language"), string(value, "a translation"))
+        for language, value in translations
+    ]
+    translations = [(language, value) for language, value in translations if value]
+
+    conjugations = raw.get('conjugations') or []
+    if isinstance(conjugations, str):
+        try:
+            conjugations = json.loads(conjugations)
+        except ValueError:
+            raise RecordError("'conjugations' is not valid JSON")
+    if isinstance(conjugations, dict):
+        if not all(isinstance(persons, dict) for persons in conjugations.values()):
+            raise RecordError("'conjugations' must map each tense to a {person: form} object")
+        conjugations = [
+            {'tense': tense, 'person': person, 'conjugated_form': form}
+            for tense, persons in conjugations.items()
+            for person, form in persons.items()
+        ]
+    if not isinstance(conjugations, list):
+        raise RecordError("'conjugations' must be an object or a list")
+    parsed_conjugations = []
+    for item in conjugations:
+        if not isinstance(item, dict) or item.get('tense') not in VerbTense.values \
+                or item.get('person') not in VerbPerson.values:
+            raise RecordError(f"invalid conjugation {item!r}")
+        form = string(item.get('conjugated_form'), "a conjugated form")
+        if not form:
+            raise RecordError(f"invalid conjugation {item!r}")
+        parsed_conjugations.append((item['tense'], item['person'], form))
+    if parsed_conjugations and category != WordCategory.VERB:
+        raise RecordError("conjugations given for a word that is not a verb")
+
+    return {
+        'text': text,
+        'category': category,
+        'categories': categories,
+        'translations': translations,
+        'conjugations': parsed_conjugations,
+    }
+
+
+def read_records(path, fmt):
+    """Yield raw records one at a time, never loading the whole file."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+            return
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield RecordError("invalid JSON")
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream words, categories, translations and verb conjugations from a CSV or JSONL file "
+        "into the dictionary, upserting on natural keys in batched transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file to import")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, path, format=None, batch_size=1000, **options):
+        fmt = format or ('csv' if Path(path).suffix.lower() == '.csv' else 'jsonl')
+        if not Path(path).is_file():
+            raise CommandError(f"No such file: {path}")
+
+        totals = Counter()
+        for batch in batched(read_records(path, fmt), batch_size):
+            records = []
+            for raw in batch:
+                totals['rows'] += 1
+                try:
+                    if isinstance(raw, RecordError):
+                        raise raw
+                    records.append(parse_record(raw))
+                except RecordError as exc:
+                    totals['errors'] += 1
+                    self.stderr.write(f"row {totals['rows']}: {exc}")
+
+            with transaction.atomic():
+                totals.update(self.import_batch(records))
+                # Bulk writes skip signals, so invalidate cached responses explicitly
+                # (import_batch records its changes for the same reason)
+                cache.bump(Category, Word, Translation, Verb, VerbConjugation)
+            self.stdout.write(
+                f"{totals['rows']} rows: {totals['words']} words, {totals['translations']} translations, "
+                f"{totals['conjugations_created']} conjugations created, "
+                f"{totals['conjugations_updated']} updated, {totals['conjugations_deleted']} deleted, "
+                f"{totals['errors']} errors"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {totals['rows'] - totals['errors']} rows from {path}"))
+
+    def import_batch(self, records):
+        stats = Counter()
+        if not records:
+            return stats
+
+        # Categories, by unique name
+        names = {name for record in records for name in record['categories']}
+        existing_names = set(Category.objects.filter(name__in=names).values_list('name', flat=True))
+        Category.objects.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+        category_ids = dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+        changes.record_changes(Category, [category_ids[name] for name in names - existing_names], ChangeLog.Action.INSERT)
+
+        # Words, keyed on (text, category); the oldest row wins if the table has duplicates
+        word_ids = {}
+        texts = {record['text'] for record in records}
+        for text, category, pk in Word.objects.filter(text__in=texts).order_by('id').values_list('text', 'category', 'id'):
+            word_ids.setdefault((text, category), pk)
+        new_words = {}
+        for record in records:
+            key = (record['text'], record['category'])
+            if key not in word_ids:
+                new_words.setdefault(key, Word(text=record['text'], category=record['category']))
+        for word in Word.objects.bulk_create(new_words.values()):
+            word_ids[(word.text, word.category)] = word.pk
+        search.index_objects('word', [(word.pk, word.text) for word in new_words.values()])
+        new_word_ids = {word.pk for word in new_words.values()}
+        changes.record_changes(Word, new_word_ids, ChangeLog.Action.INSERT)
+        stats['words'] += len(new_words)
+
+        # Word <-> Category links
+        Link = Word.categories.through
+        links = {
+            (word_ids[(record['text'], record['category'])], category_ids[name])
+            for record in records
+            for name in record['categories']
+        }
+        links -= set(Link.objects.filter(word_id__in={word_id for word_id, _ in links}).values_list('word_id', 'category_id'))
+        Link.objects.bulk_create(
+            [Link(word_id=word_id, category_id=category_id) for word_id, category_id in links], ignore_conflicts=True,
+        )
+        changes.record_changes(Word, {word_id for word_id, _ in links} - new_word_ids, ChangeLog.Action.UPDATE)
+
+        # Translations, keyed on (word, language, text)
+        word_ct = ContentType.objects.get_for_model(Word)
+        existing = set(Translation.objects.filter(
+            content_type=word_ct, object_id__in=set(word_ids.values()),
+        ).values_list('object_id', 'language', 'text'))
+        new_translations = {}
+        for record in records:
+            word_id = word_ids[(record['text'], record['category'])]
+            for language, text in record['translations']:
+                key = (word_id, language, text)
+                if key not in existing:
+                    new_translations.setdefault(
+                        key, Translation(content_type=word_ct, object_id=word_id, language=language, text=text)
+                    )
+        Translation.objects.bulk_create(new_translations.values())
+        search.index_objects('translation', [(t.pk, t.text) for t in new_translations.values()])
+        changes.record_changes(Translation, [t.pk for t in new_translations.values()], ChangeLog.Action.INSERT)
+        stats['translations'] += len(new_translations)
+
+        # Verbs and their conjugations, keyed on (verb, tense, person)
+        verb_words = {
+            word_ids[(record['text'], record['category'])]
+            for record in records if record['category'] == WordCategory.VERB
+        }
+        verb_ids, derived = {}, set()
+        for word_id, verb_id, derive_regular in Verb.objects.filter(word_id__in=verb_words).values_list(
+            'word_id', 'id', 'derive_regular',
+        ):
+            verb_ids[word_id] = verb_id
+            if derive_regular:
+                derived.add(verb_id)
+        new_verbs = Verb.objects.bulk_create([Verb(word_id=pk) for pk in verb_words - verb_ids.keys()])
+        for verb in new_verbs:
+            verb_ids[verb.word_id] = verb.pk
+        changes.record_changes(Verb, [verb.pk for verb in new_verbs], ChangeLog.Action.INSERT)
+
+        # A complete table makes its verb derive_regular. Such verbs only store the forms the
+        # rules don't produce, and a regular form replaces a stored override; other verbs
+        # store the forms they are given.
+        tables = {}
+        for record in records:
+            if record['conjugations']:
+                verb_id = verb_ids[word_ids[(record['text'], record['category'])]]
+                table = tables.setdefault(verb_id, (record['text'], {}))[1]
+                table.update(((tense, person), form) for tense, person, form in record['conjugations'])
+        now_derived = {
+            verb_id for verb_id, (infinitive, table) in tables.items()
+            if verb_id not in derived and conjugation.is_complete(infinitive, table)
+        }
+        derived |= now_derived
+        Verb.objects.filter(pk__in=now_derived).update(derive_regular=True)
+        changes.record_changes(Verb, now_derived - {verb.pk for verb in new_verbs}, ChangeLog.Action.UPDATE)
+
+        wanted, regular = {}, set()
+        for verb_id, (infinitive, table) in tables.items():
+            for (tense, person), form in table.items():
+                if verb_id in derived and conjugation.is_regular(infinitive, tense, person, form):
+                    regular.add((verb_id, tense, person))
+                else:
+                    wanted[(verb_id, tense, person)] = form
+        current = {
+            (verb_id, tense, person): (pk, form)
+            for pk, verb_id, tense, person, form in VerbConjugation.objects.filter(
+                verb_id__in={key[0] for key in wanted} | {key[0] for key in regular},
+            ).values_list('id', 'verb_id', 'tense', 'person', 'conjugated_form')
+        }
+        to_delete = [current[key][0] for key in regular if key in current]
+        to_create, to_update = [], []
+        for (verb_id, tense, person), form in wanted.items():
+            row = VerbConjugation(
+                verb_id=verb_id, tense=tense, person=person,
+                conjugated_form=form, normalized_form=fold_text(form),
+            )
+            if (verb_id, tense, person) not in current:
+                to_create.append(row)
+            elif current[(verb_id, tense, person)][1] != form:
+                row.pk = current[(verb_id, tense, person)][0]
+                to_update.append(row)
+        VerbConjugation.objects.bulk_create(to_create)
+        VerbConjugation.objects.bulk_update(to_update, ['conjugated_form', 'normalized_form'])
+        VerbConjugation.objects.filter(pk__in=to_delete).delete()  # signals log these deletes
+        changes.record_changes(VerbConjugation, [c.pk for c in to_create], ChangeLog.Action.INSERT)
+        changes.record_changes(VerbConjugation, [c.pk for c in to_update], ChangeLog.Action.UPDATE)
+        stats['conjugations_created'] += len(to_create)
+        stats['conjugations_updated'] += len(to_update)
+        stats['conjugations_deleted'] += len(to_delete)
+        return stats
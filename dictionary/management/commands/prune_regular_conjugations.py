@@ -0,0 +1,64 @@
+from collections import defaultdict
+from itertools import batched
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from dictionary import cache, changes, conjugation
+from dictionary.models import ChangeLog, Verb, VerbConjugation
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored conjugations that the conjugation rules compute, keeping only irregular forms. "
+        "Only verbs whose stored table is complete are pruned; they are marked derive_regular."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Verbs per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would be deleted")
+
+    def handle(self, *args, **options):
+        verbs = Verb.objects.order_by('pk').values_list('pk', 'word__text', 'derive_regular')
+        pruned = kept = last = 0
+        while batch := list(verbs.filter(pk__gt=last)[:options['batch_size']]):
+            last = batch[-1][0]
+            infinitives = {pk: infinitive for pk, infinitive, _ in batch}
+            derived = {pk for pk, _, derive_regular in batch if derive_regular}
+            tables = defaultdict(dict)
+            for pk, verb_id, tense, person, form in VerbConjugation.objects.filter(verb_id__in=infinitives).values_list(
+                'pk', 'verb_id', 'tense', 'person', 'conjugated_form',
+            ):
+                tables[verb_id][(tense, person)] = (pk, form)
+
+            regular, touched = [], set()
+            for verb_id, table in tables.items():
+                infinitive = infinitives[verb_id]
+                # A partial table of an irregular verb says nothing about its missing forms
+                if verb_id not in derived and not conjugation.is_complete(infinitive, table):
+                    kept += len(table)
+                    continue
+                for (tense, person), (pk, form) in table.items():
+                    if conjugation.is_regular(infinitive, tense, person, form):
+                        regular.append(pk)
+                        touched.add(verb_id)
+                    else:
+                        kept += 1
+            pruned += len(regular)
+            if options['dry_run'] or not regular:
+                continue
+            with transaction.atomic():
+                Verb.objects.filter(pk__in=touched - derived).update(derive_regular=True)
+                # A plain DELETE: nothing to cascade, and the change log and cache are updated below
+                with connection.cursor() as cursor:
+                    for ids in batched(regular, 500):
+                        cursor.execute(
+                            f"DELETE FROM {VerbConjugation._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                            ids,
+                        )
+                changes.record_changes(VerbConjugation, regular, ChangeLog.Action.DELETE)
+                changes.record_changes(Verb, touched, ChangeLog.Action.UPDATE)
+                cache.bump(Verb, VerbConjugation)
+
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {pruned} regular conjugations, {kept} stored forms remain"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:05
+
+from django.db import migrations
+
+TABLE = 'dictionary_search'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "text, kind UNINDEXED, object_id UNINDEXED, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    for kind, tag, table in (
+        ('word', 1, 'dictionary_word'),
+        ('sentence', 2, 'dictionary_sentence'),
+        ('translation', 3, 'dictionary_translation'),
+    ):
+        schema_editor.execute(
+            f"INSERT INTO {TABLE} (rowid, text, kind, object_id) "
+            f"SELECT id * 4 + {tag}, text, '{kind}', id FROM {table}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
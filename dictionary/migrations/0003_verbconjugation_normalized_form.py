@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:40
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def fold_text(text):
+    # A copy of dictionary.models.fold_text as of this migration, so later changes don't alter it
+    decomposed = unicodedata.normalize('NFKD', text.strip().lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def backfill_normalized_form(apps, schema_editor):
+    VerbConjugation = apps.get_model('dictionary', 'VerbConjugation')
+    batch = []
+    for conjugation in VerbConjugation.objects.only('conjugated_form').iterator(chunk_size=2000):
+        conjugation.normalized_form = fold_text(conjugation.conjugated_form)
+        batch.append(conjugation)
+        if len(batch) >= 2000:
+            VerbConjugation.objects.bulk_update(batch, ['normalized_form'])
+            batch = []
+    VerbConjugation.objects.bulk_update(batch, ['normalized_form'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verbconjugation',
+            name='normalized_form',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_normalized_form, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('dictionary', '0003_verbconjugation_normalized_form'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='translation',
+            name='language',
+            field=models.CharField(db_index=True, default='en', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='verbconjugation',
+            name='conjugated_form',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='word',
+            name='text',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='translation',
+            index=models.Index(fields=['content_type', 'object_id', 'language'], name='translation_target_idx'),
+        ),
+    ]
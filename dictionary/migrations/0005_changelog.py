@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('I', 'Insert'), ('U', 'Update'), ('D', 'Delete')], max_length=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='changelog_object_idx')],
+            },
+        ),
+    ]
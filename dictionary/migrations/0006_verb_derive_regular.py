@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0005_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verb',
+            name='derive_regular',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,206 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from . import cache, changes, rows, search
+from .models import ChangeLog
+
+
+class BulkWriteMixin:
+    """
+    Adds a batch endpoint to a ModelViewSet:
+
+        POST <prefix>/bulk/
+        {"create": [{...}, ...], "update": [{"id": 1, ...}, ...], "delete": [3, 4]}
+
+    A bare list is taken as the "create" list. The whole payload is validated before
+    anything is written, including unique values repeated within the batch, and the
+    writes run in one transaction as a bulk_create, a bulk_update and a single delete.
+    Validation errors come back keyed by the position of the offending item in its list.
+    """
+    bulk_max_items = 5000
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        data = request.data
+        if isinstance(data, list):
+            # A bare list is a batch of objects to create
+            data = {'create': data}
+        if not isinstance(data, dict):
+            return Response(
+                {"detail": "Expected an object with 'create', 'update' and 'delete' lists."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        create_data = data.get('create', [])
+        update_data = data.get('update', [])
+        delete_ids = data.get('delete', [])
+        if not all(isinstance(value, list) for value in (create_data, update_data, delete_ids)):
+            return Response(
+                {"detail": "'create', 'update' and 'delete' must be lists."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(create_data) + len(update_data) + len(delete_ids) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} items per request."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # One context for the whole batch, so serializers can share lookups between items
+        context = self.get_serializer_context()
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+
+        delete_ids = [self.parse_pk(model, pk) for pk in delete_ids]
+        if None in delete_ids:
+            return Response({"delete": ["Invalid id."]}, status=status.HTTP_400_BAD_REQUEST)
+        update_ids = [self.parse_pk(model, item.get('id')) if isinstance(item, dict) else None for item in update_data]
+
+        creator = serializer_class(data=create_data, many=True, context=context)
+        create_valid = creator.is_valid()
+
+        instances = model._default_manager.in_bulk([pk for pk in update_ids if pk is not None])
+        updaters, update_errors = [], {}
+        for index, (item, pk) in enumerate(zip(update_data, update_ids)):
+            instance = instances.get(pk)
+            if instance is None:
+                update_errors[str(index)] = {"id": ["Not found."]}
+                continue
+            updater = serializer_class(instance, data=item, partial=True, context=context)
+            if not updater.is_valid():
+                update_errors[str(index)] = updater.errors
+            updaters.append(updater)
+
+        if not create_valid or update_errors:
+            create_errors = creator.errors
+            if isinstance(create_errors, list):
+                create_errors = {str(index): errors for index, errors in enumerate(create_errors) if errors}
+            return Response({"create": create_errors, "update": update_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The serializers check uniqueness against the table, not against the rest of the batch
+        create_errors, update_errors = self.batch_unique_errors(
+            model, [(None, data) for data in creator.validated_data], [(u.instance, u.validated_data) for u in updaters],
+        )
+        if create_errors or update_errors:
+            return Response({"create": create_errors, "update": update_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                created = self.bulk_create_objects(model, creator.validated_data)
+                updated = self.bulk_update_objects(model, [(u.instance, u.validated_data) for u in updaters])
+                _, deleted = model._default_manager.filter(pk__in=delete_ids).delete()
+                self.bulk_written(model, created, updated)
+        except IntegrityError:
+            # e.g. a concurrent write took a unique value after validation
+            return Response(
+                {"detail": "The batch conflicts with the current data; nothing was written."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        written = self.get_queryset().in_bulk([obj.pk for obj in created + updated])
+        return Response({
+            "created": self.get_serializer([written[obj.pk] for obj in created], many=True).data,
+            "updated": self.get_serializer([written[obj.pk] for obj in updated], many=True).data,
+            # Rows of this model only, not the related rows removed by cascade
+            "deleted": deleted.get(model._meta.label, 0),
+        })
+
+    @staticmethod
+    def batch_unique_errors(model, creates, updates):
+        """
+        Errors for batch items that repeat the unique values of an earlier item, as
+        `(create_errors, update_errors)` keyed by position. Items are `(instance, data)`,
+        with instance None for creates.
+        """
+        unique_sets = [(field.name,) for field in model._meta.local_fields if field.unique and not field.primary_key]
+        unique_sets += [tuple(fields) for fields in model._meta.unique_together]
+        unique_sets += [tuple(constraint.fields) for constraint in model._meta.total_unique_constraints]
+        errors = {'create': {}, 'update': {}}
+        for fields in dict.fromkeys(unique_sets):
+            seen = set()
+            for kind, items in (('create', creates), ('update', updates)):
+                for index, (instance, data) in enumerate(items):
+                    value = tuple(data[name] if name in data else getattr(instance, name, None) for name in fields)
+                    if None in value:
+                        continue
+                    if value in seen:
+                        key = fields[0] if len(fields) == 1 else 'non_field_errors'
+                        message = f"Another item in this batch has the same {', '.join(fields)}."
+                        errors[kind].setdefault(str(index), {}).setdefault(key, []).append(message)
+                    seen.add(value)
+        return errors['create'], errors['update']
+
+    @staticmethod
+    def parse_pk(model, value):
+        try:
+            return model._meta.pk.to_python(value)
+        except ValidationError:
+            return None
+
+    def bulk_create_objects(self, model, items):
+        objs, relations = [], []
+        for data in items:
+            fields = dict(data)
+            relations.append({f.name: fields.pop(f.name) for f in model._meta.many_to_many if f.name in fields})
+            objs.append(model(**fields))
+        model._default_manager.bulk_create(objs)
+        self.bulk_set_m2m(model, objs, relations)
+        return objs
+
+    def bulk_update_objects(self, model, items):
+        objs, relations, fields = [], [], set()
+        for instance, data in items:
+            values = dict(data)
+            relations.append({f.name: values.pop(f.name) for f in model._meta.many_to_many if f.name in values})
+            for attr, value in values.items():
+                setattr(instance, attr, value)
+            fields.update(values)
+            objs.append(instance)
+        if fields:
+            model._default_manager.bulk_update(objs, fields)
+        self.bulk_set_m2m(model, objs, relations)
+        return objs
+
+    def bulk_set_m2m(self, model, objs, relations):
+        """Replace the given many-to-many sets with one delete and one insert per field."""
+        for field in model._meta.many_to_many:
+            changed = [(obj, rel[field.name]) for obj, rel in zip(objs, relations) if field.name in rel]
+            if not changed:
+                continue
+            through = field.remote_field.through
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            through.objects.filter(**{f"{source}__in": [obj.pk for obj, _ in changed]}).delete()
+            through.objects.bulk_create([
+                through(**{f"{source}_id": obj.pk, f"{target}_id": related.pk})
+                for obj, related_objs in changed
+                for related in related_objs
+            ], ignore_conflicts=True)
+
+    def bulk_written(self, model, created, updated):
+        """Bulk writes skip model signals, so refresh the search index, cache versions and change log here."""
+        cache.bump(model, *(field.related_model for field in model._meta.many_to_many))
+        kind = search.kind_for(model)
+        if kind:
+            search.index_objects(kind, [(obj.pk, obj.text) for obj in created + updated])
+        changes.record_changes(model, [obj.pk for obj in created], ChangeLog.Action.INSERT)
+        changes.record_changes(model, [obj.pk for obj in updated], ChangeLog.Action.UPDATE)
+
+
+class ValuesListMixin:
+    """
+    Serve `list` from `values()` rows instead of serializer instances: the filtered
+    queryset is paginated as dicts and the builder registered for its model in
+    `dictionary.rows.ROWS` turns a page into the serializer's output. Turned off
+    with `settings.DICTIONARY_FAST_LISTS = False`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not getattr(settings, 'DICTIONARY_FAST_LISTS', True) or queryset.model not in rows.ROWS:
+            return super().list(request, *args, **kwargs)
+        fields, build = rows.ROWS[queryset.model]
+        # Keyed 'pk' so the cursor paginator can read the position from the dicts
+        queryset = queryset.prefetch_related(None).values('pk', *fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(build(page))
+        return Response(build(list(queryset)))
@@ -1,6 +1,13 @@
+import unicodedata
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+
+
+def fold_text(text):
+    """Lower-case `text` and strip diacritics, so 'Hablaríamos' and 'hablariamos' compare equal."""
+    decomposed = unicodedata.normalize('NFKD', text.strip().lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
 
 
 class Category(models.Model):
@@ -21,9 +28,10 @@ class WordCategory(models.TextChoices):
 
 
 class Word(models.Model):
-    text = models.CharField(max_length=100)
+    text = models.CharField(max_length=100, db_index=True)
     category = models.CharField(max_length=10, choices=WordCategory.choices)
     categories = models.ManyToManyField(Category, blank=True, related_name='words')
+    translations = GenericRelation('Translation')
 
     def __str__(self):
         return self.text
@@ -31,6 +39,9 @@ class Word(models.Model):
 
 class Verb(models.Model):
     word = models.OneToOneField(Word, on_delete=models.CASCADE, related_name='verb_info')
+    # Set once a complete table was checked against the conjugation rules: only then are the
+    # regular forms left out of the stored conjugations and computed (dictionary.conjugation)
+    derive_regular = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
         if self.word.category != WordCategory.VERB:
@@ -65,11 +76,17 @@ class VerbConjugation(models.Model):
     verb = models.ForeignKey(Verb, on_delete=models.CASCADE, related_name='conjugations')
     tense = models.CharField(max_length=20, choices=VerbTense.choices)
     person = models.CharField(max_length=2, choices=VerbPerson.choices)
-    conjugated_form = models.CharField(max_length=100)
+    conjugated_form = models.CharField(max_length=100, db_index=True)
+    # Accent-folded copy of conjugated_form, indexed for reverse lookups
+    normalized_form = models.CharField(max_length=100, db_index=True, editable=False, default='')
 
     class Meta:
         unique_together = ('verb', 'tense', 'person')
 
+    def save(self, *args, **kwargs):
+        self.normalized_form = fold_text(self.conjugated_form)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.verb.word.text} - {self.tense} - {self.person}: {self.conjugated_form}"
 
@@ -77,13 +94,14 @@ class VerbConjugation(models.Model):
 class Sentence(models.Model):
     text = models.TextField()
     related_words = models.ManyToManyField(Word, blank=True, related_name='sentences')
+    translations = GenericRelation('Translation')
 
     def __str__(self):
         return self.text
 
 
 class Translation(models.Model):
-    language = models.CharField(max_length=10, default='en')  # e.g. 'en'
+    language = models.CharField(max_length=10, default='en', db_index=True)  # e.g. 'en'
     text = models.CharField(max_length=255)
 
     # Generic relation to Word, Sentence, or future models
@@ -91,5 +109,35 @@ class Translation(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
 
+    class Meta:
+        indexes = [
+            # Serves the generic lookups by (content_type, object_id), optionally by language
+            models.Index(fields=['content_type', 'object_id', 'language'], name='translation_target_idx'),
+        ]
+
     def __str__(self):
         return f"{self.text} ({self.language})"
+
+
+class ChangeLog(models.Model):
+    """
+    Latest change of each dictionary object, in commit order. `seq` only grows;
+    an object's older entries are dropped when it changes again.
+    """
+    class Action(models.TextChoices):
+        INSERT = 'I', 'Insert'
+        UPDATE = 'U', 'Update'
+        DELETE = 'D', 'Delete'
+
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)  # model_name, e.g. 'word'
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=1, choices=Action.choices)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id'], name='changelog_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.seq}: {self.action} {self.model} {self.object_id}"
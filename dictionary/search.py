@@ -0,0 +1,134 @@
+"""
+Full-text search over words, sentences and translations.
+
+On SQLite the texts are mirrored into an FTS5 virtual table tokenized with
+`unicode61 remove_diacritics 2`, so "cancion" matches "canción", and every query
+term is matched as a prefix. The table is kept in sync by the signal handlers in
+`dictionary.signals`; bulk writers call `index_objects`/`remove_objects` directly.
+The virtual table itself is created by migration 0002. Other database backends
+fall back to `icontains` lookups.
+"""
+import re
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+from .models import Word, Sentence, Translation
+
+TABLE = 'dictionary_search'
+
+# kind -> (model, tag). The tag is folded into the FTS rowid so a row can be
+# replaced or removed by rowid instead of scanning the unindexed columns.
+KINDS = {
+    'word': (Word, 1),
+    'sentence': (Sentence, 2),
+    'translation': (Translation, 3),
+}
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def kind_for(model):
+    """Return the search kind for a model class, or None if it is not indexed."""
+    for kind, (indexed_model, _) in KINDS.items():
+        if model is indexed_model:
+            return kind
+    return None
+
+
+def rowid(kind, pk):
+    return pk * 4 + KINDS[kind][1]
+
+
+def index_objects(kind, rows, using='default'):
+    """Insert or replace `(pk, text)` pairs of the given kind in the index."""
+    if not is_supported(using):
+        return
+    rows = [(rowid(kind, pk), text, kind, pk) for pk, text in rows]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, text, kind, object_id) VALUES (%s, %s, %s, %s)", rows
+        )
+
+
+def remove_objects(kind, pks, using='default'):
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(rowid(kind, pk),) for pk in pks])
+
+
+def rebuild(using='default', chunk_size=2000):
+    """Repopulate the whole index from the source tables."""
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+    for kind, (model, _) in KINDS.items():
+        rows = model.objects.using(using).values_list('pk', 'text').iterator(chunk_size=chunk_size)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                index_objects(kind, batch, using)
+                batch = []
+        index_objects(kind, batch, using)
+
+
+def build_match(query):
+    """
+    Turn free user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term (`"canci"*`) and all terms must match,
+    so FTS5 operators typed by the user are never interpreted.
+    """
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(query, kinds=None, limit=20, using=None):
+    """
+    Return up to `limit` ranked hits as dicts with `type`, `id` and `text`.
+
+    `kinds` optionally restricts the result to some of 'word', 'sentence', 'translation'.
+    Without `using`, the query goes wherever the router sends dictionary reads.
+    """
+    using = using or router.db_for_read(Word)
+    kinds = [kind for kind in (kinds or KINDS) if kind in KINDS]
+    match = build_match(query)
+    if not match or not kinds:
+        return []
+    if not is_supported(using):
+        return _fallback_search(query, kinds, limit, using)
+
+    placeholders = ', '.join(['%s'] * len(kinds))
+    sql = (
+        f"SELECT kind, object_id, text FROM {TABLE} "
+        f"WHERE {TABLE} MATCH %s AND kind IN ({placeholders}) "
+        "ORDER BY rank LIMIT %s"
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [match, *kinds, limit])
+        return [{'type': kind, 'id': pk, 'text': text} for kind, pk, text in cursor.fetchall()]
+
+
+def matching(kind, query):
+    """
+    Subquery selecting the ids of the objects of `kind` whose text matches `query`,
+    for `pk__in` filters. SQLite only; the query must contain at least one term.
+    """
+    return RawSQL(f"SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s", [build_match(query), kind])
+
+
+def _fallback_search(query, kinds, limit, using):
+    hits = []
+    for kind in kinds:
+        model = KINDS[kind][0]
+        rows = model.objects.using(using).filter(text__icontains=query.strip()).values_list('pk', 'text')
+        hits.extend({'type': kind, 'id': pk, 'text': text} for pk, text in rows[:limit - len(hits)])
+        if len(hits) >= limit:
+            break
+    return hits
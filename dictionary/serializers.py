@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
-from .models import Word, Verb, Sentence, Translation, Category, WordCategory, VerbConjugation
+from django.db import transaction
+from .models import Word, Verb, Sentence, Translation, Category, WordCategory, VerbConjugation, ChangeLog, fold_text
+from . import cache, changes, conjugation
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,11 +24,17 @@ class TranslationSerializer(serializers.ModelSerializer):
 
     def validate_content_type(self, value):
         """Convert model name to ContentType object."""
-        try:
-            ct = ContentType.objects.get(model=value.lower())
-            return ct
-        except ContentType.DoesNotExist:
+        # Memoized in the (shared) serializer context so a batch resolves each type once
+        content_types = self.context.setdefault('content_types', {})
+        name = value.lower()
+        if name not in content_types:
+            try:
+                content_types[name] = ContentType.objects.get(model=name)
+            except ContentType.DoesNotExist:
+                content_types[name] = None
+        if content_types[name] is None:
             raise serializers.ValidationError(f"Invalid content type: {value}")
+        return content_types[name]
 
     def create(self, validated_data):
         validated_data['content_type'] = validated_data['content_type']
@@ -45,9 +53,8 @@ class WordSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_translations(self, obj):
-        ct = ContentType.objects.get_for_model(Word)
-        translations = Translation.objects.filter(content_type=ct, object_id=obj.id)
-        return TranslationSerializer(translations, many=True).data
+        # Served from the view's prefetch, so a whole page costs one query.
+        return TranslationSerializer(obj.translations.all(), many=True).data
 
 
 # --- Verb with nested conjugations ---
@@ -61,6 +68,11 @@ class VerbSerializer(serializers.ModelSerializer):
     """
     Read/Write serializer that supports nested conjugations.
     POST/PUT/PATCH payload includes `word` (pk) and `conjugations`: [{tense, person, conjugated_form}, ...]
+
+    A payload with every form the rules cover makes the verb `derive_regular` (see
+    dictionary.conjugation): only the forms that differ from the regular ones are
+    stored, and the output merges both. Computed forms have no `id`. Any other
+    payload is stored and returned as given.
     """
     conjugations = VerbConjugationSerializer(many=True)
 
@@ -68,6 +80,12 @@ class VerbSerializer(serializers.ModelSerializer):
         model = Verb
         fields = ['id', 'word', 'conjugations']
 
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        if instance.derive_regular:
+            rep['conjugations'] = conjugation.merge(instance.word.text, rep['conjugations'])
+        return rep
+
     def validate(self, attrs):
         word = attrs.get('word') or getattr(self.instance, 'word', None)
         if not word:
@@ -78,28 +96,70 @@ class VerbSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         conj_data = validated_data.pop('conjugations', [])
-        verb = Verb.objects.create(**validated_data)
-        # Create conjugations
-        for c in conj_data:
-            VerbConjugation.objects.create(verb=verb, **c)
+        with transaction.atomic():
+            verb = Verb.objects.create(**validated_data)
+            self.sync_conjugations(verb, conj_data, current={})
         return verb
 
     def update(self, instance, validated_data):
         conj_data = validated_data.pop('conjugations', None)
 
-        # update the simple fields (word generally won’t change, but allow it)
-        for attr, val in validated_data.items():
-            setattr(instance, attr, val)
-        instance.save()
+        with transaction.atomic():
+            # update the simple fields (word generally won’t change, but allow it)
+            for attr, val in validated_data.items():
+                setattr(instance, attr, val)
+            instance.save()
 
-        # If conjugations provided, replace them (simple, reliable strategy)
-        if conj_data is not None:
-            instance.conjugations.all().delete()
-            for c in conj_data:
-                VerbConjugation.objects.create(verb=instance, **c)
+            # If conjugations provided, they replace the stored set
+            if conj_data is not None:
+                self.sync_conjugations(instance, conj_data)
 
         return instance
 
+    def sync_conjugations(self, verb, conj_data, current=None):
+        """
+        Reconcile the verb's stored conjugations with `conj_data`, keyed on (tense, person).
+        When `conj_data` is a complete table, the forms the rules compute are not stored.
+        Issues at most one delete, one bulk_update and one bulk_create, and keeps the
+        primary keys of unchanged rows.
+        """
+        infinitive = verb.word.text
+        table = {(c['tense'], c['person']): c['conjugated_form'] for c in conj_data}
+        derive = conjugation.is_complete(infinitive, table)
+        wanted = {
+            (tense, person): form for (tense, person), form in table.items()
+            if not (derive and conjugation.is_regular(infinitive, tense, person, form))
+        }
+        if verb.derive_regular != derive:
+            verb.derive_regular = derive
+            verb.save(update_fields=['derive_regular'])
+        if current is None:
+            current = {(c.tense, c.person): c for c in verb.conjugations.all()}
+
+        removed = [c.pk for key, c in current.items() if key not in wanted]
+        changed, added = [], []
+        for (tense, person), form in wanted.items():
+            stored = current.get((tense, person))
+            if stored is None:
+                added.append(VerbConjugation(
+                    verb=verb, tense=tense, person=person, conjugated_form=form, normalized_form=fold_text(form)
+                ))
+            elif stored.conjugated_form != form:
+                stored.conjugated_form = form
+                stored.normalized_form = fold_text(form)
+                changed.append(stored)
+
+        if removed:
+            VerbConjugation.objects.filter(pk__in=removed).delete()
+        if changed:
+            VerbConjugation.objects.bulk_update(changed, ['conjugated_form', 'normalized_form'])
+        if added:
+            VerbConjugation.objects.bulk_create(added)
+        if removed or changed or added:
+            cache.bump(VerbConjugation)
+            changes.record_changes(VerbConjugation, [c.pk for c in changed], ChangeLog.Action.UPDATE)
+            changes.record_changes(VerbConjugation, [c.pk for c in added], ChangeLog.Action.INSERT)
+
 class SentenceSerializer(serializers.ModelSerializer):
     translations = serializers.SerializerMethodField()
 
@@ -108,7 +168,6 @@ class SentenceSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_translations(self, obj):
-        ct = ContentType.objects.get_for_model(Sentence)
-        translations = Translation.objects.filter(content_type=ct, object_id=obj.id)
-        return TranslationSerializer(translations, many=True).data
+        # Served from the view's prefetch, so a whole page costs one query.
+        return TranslationSerializer(obj.translations.all(), many=True).data
     
\ No newline at end of file
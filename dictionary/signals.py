@@ -0,0 +1,78 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Word, Sentence, Translation, Category, Verb, VerbConjugation, ChangeLog
+from . import cache, changes, search
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_save, sender=Sentence)
+@receiver(post_save, sender=Translation)
+def index_text(sender, instance, using, **kwargs):
+    """Keep the full-text index in step with saved words, sentences and translations."""
+    search.index_objects(search.kind_for(sender), [(instance.pk, instance.text)], using)
+
+
+@receiver(post_delete, sender=Word)
+@receiver(post_delete, sender=Sentence)
+@receiver(post_delete, sender=Translation)
+def unindex_text(sender, instance, using, **kwargs):
+    search.remove_objects(search.kind_for(sender), [instance.pk], using)
+
+
+CACHED_MODELS = (Word, Sentence, Translation, Category, Verb, VerbConjugation)
+
+
+def bump_version(sender, using, **kwargs):
+    """Invalidate cached responses that depend on the changed model."""
+    cache.bump(sender, using=using)
+
+
+def bump_m2m_versions(sender, instance, model, using, **kwargs):
+    if kwargs['action'].startswith('post_'):
+        cache.bump(type(instance), model, using=using)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_version, sender=model, dispatch_uid=f'bump-save-{model._meta.label_lower}')
+    post_delete.connect(bump_version, sender=model, dispatch_uid=f'bump-delete-{model._meta.label_lower}')
+m2m_changed.connect(bump_m2m_versions, sender=Word.categories.through, dispatch_uid='bump-word-categories')
+m2m_changed.connect(bump_m2m_versions, sender=Sentence.related_words.through, dispatch_uid='bump-sentence-words')
+
+
+def log_save(sender, instance, created, using, **kwargs):
+    action = ChangeLog.Action.INSERT if created else ChangeLog.Action.UPDATE
+    changes.record_changes(sender, [instance.pk], action, using)
+    if sender is Word and not created:
+        # The verb's computed conjugations follow the infinitive
+        verbs = Verb.objects.using(using).filter(word=instance).values_list('pk', flat=True)
+        changes.record_changes(Verb, verbs, ChangeLog.Action.UPDATE, using)
+
+
+def log_delete(sender, instance, using, **kwargs):
+    changes.record_changes(sender, [instance.pk], ChangeLog.Action.DELETE, using)
+
+
+def log_m2m_change(sender, instance, model, pk_set, action, reverse, using, **kwargs):
+    """Link changes update the object that owns the field (the word or the sentence)."""
+    if not reverse:
+        if action.startswith('post_'):
+            changes.record_changes(type(instance), [instance.pk], ChangeLog.Action.UPDATE, using)
+        return
+    field = next(f for f in model._meta.many_to_many if f.remote_field.through is sender)
+    if action in ('post_add', 'post_remove'):
+        ids = pk_set
+    elif action == 'pre_clear':
+        # The links are about to go, so look up which objects they belong to now
+        ids = sender.objects.using(using).filter(
+            **{f'{field.m2m_reverse_field_name()}_id': instance.pk}
+        ).values_list(f'{field.m2m_field_name()}_id', flat=True)
+    else:
+        return
+    changes.record_changes(model, ids, ChangeLog.Action.UPDATE, using)
+
+
+for model in changes.TRACKED_MODELS:
+    post_save.connect(log_save, sender=model, dispatch_uid=f'log-save-{model._meta.label_lower}')
+    post_delete.connect(log_delete, sender=model, dispatch_uid=f'log-delete-{model._meta.label_lower}')
+m2m_changed.connect(log_m2m_change, sender=Word.categories.through, dispatch_uid='log-word-categories')
+m2m_changed.connect(log_m2m_change, sender=Sentence.related_words.through, dispatch_uid='log-sentence-words')
@@ -1,3 +1,606 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import re
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, router
+from django.http import FileResponse, HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from spanglish.instrumentation import QueryInstrumentationMiddleware, query_budget
+from spanglish.pagination import EstimatedCountPaginator
+from spanglish import renderers
+from spanglish.renderers import FastJSONRenderer
+from spanglish.routers import ReplicaPinningMiddleware
+from . import export, search
+from .conjugation import regular_forms
+from .models import Category, ChangeLog, Sentence, Word, Translation, Verb, VerbConjugation, VerbPerson, VerbTense, WordCategory
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite-specific")
+class QueryPlanTests(TestCase):
+    """The hot dictionary lookups must be answered from an index, not a table scan."""
+    size = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        words = Word.objects.bulk_create(
+            Word(text=f'palabra{i}', category=WordCategory.VERB) for i in range(cls.size)
+        )
+        cls.word_ct = ContentType.objects.get_for_model(Word)
+        Translation.objects.bulk_create(
+            Translation(content_type=cls.word_ct, object_id=word.pk, language=language, text=f'{language}{i}')
+            for i, word in enumerate(words)
+            for language in ('en', 'fr', 'de')
+        )
+        verbs = Verb.objects.bulk_create(Verb(word=word) for word in words[:1000])
+        VerbConjugation.objects.bulk_create(
+            VerbConjugation(
+                verb=verb, tense=VerbTense.PRESENT, person=person,
+                conjugated_form=f'{verb.word.text}-{person}', normalized_form=f'{verb.word.text}-{person}',
+            )
+            for verb in verbs
+            for person in VerbPerson.values
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertIndexed(self, queryset, table, index=None):
+        plan = queryset.explain()
+        self.assertNotIn(f"SCAN {table}", plan)
+        self.assertRegex(plan, rf"SEARCH {table} USING (COVERING )?INDEX {index or ''}")
+
+    def test_translations_by_target(self):
+        queryset = Translation.objects.filter(content_type=self.word_ct, object_id=42)
+        self.assertIndexed(queryset, 'dictionary_translation', 'translation_target_idx')
+
+    def test_translations_by_target_and_language(self):
+        queryset = Translation.objects.filter(content_type=self.word_ct, object_id=42, language='fr')
+        self.assertIndexed(queryset, 'dictionary_translation', 'translation_target_idx')
+
+    def test_translations_prefetch(self):
+        word_ids = list(Word.objects.values_list('pk', flat=True)[:50])
+        queryset = Translation.objects.filter(content_type=self.word_ct, object_id__in=word_ids)
+        self.assertIndexed(queryset, 'dictionary_translation', 'translation_target_idx')
+
+    def test_translations_by_language(self):
+        self.assertIndexed(Translation.objects.filter(language='de'), 'dictionary_translation')
+
+    def test_word_by_text(self):
+        self.assertIndexed(Word.objects.filter(text='palabra123'), 'dictionary_word')
+
+    def test_conjugation_by_form(self):
+        self.assertIndexed(VerbConjugation.objects.filter(conjugated_form='palabra7-1s'), 'dictionary_verbconjugation')
+        self.assertIndexed(VerbConjugation.objects.filter(normalized_form='palabra7-1s'), 'dictionary_verbconjugation')
+
+
+class ListQueryTests(TestCase):
+    """List endpoints run a fixed number of queries, however many rows a page holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        words = Word.objects.bulk_create(Word(text=f'palabra{i}', category=WordCategory.NOUN) for i in range(50))
+        word_ct = ContentType.objects.get_for_model(Word)
+        Translation.objects.bulk_create(
+            Translation(content_type=word_ct, object_id=word.pk, language='en', text=f'word{i}')
+            for i, word in enumerate(words)
+        )
+        categories = Category.objects.bulk_create(Category(name=f'cat{i}') for i in range(3))
+        for word in words[::7]:
+            word.categories.set(categories[::-1])
+        sentence = Sentence.objects.create(text='Hola mundo.')
+        sentence.related_words.set(words[3:0:-1])
+        Translation.objects.create(content_object=sentence, language='en', text='Hello\u2028world.')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_word_list(self):
+        with query_budget(3):
+            response = self.client.get('/dictionary/words/')
+        self.assertEqual(len(response.json()['results']), 50)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="3 queries"')
+
+    async def test_async_requests_are_instrumented(self):
+        response = await self.async_client.get('/dictionary/async/words/')
+        self.assertEqual(len(response.json()['results']), 50)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="3 queries"')
+
+    @override_settings(SQL_REPEAT_THRESHOLD=3)
+    def test_repeated_queries_are_logged(self):
+        def n_plus_one(count):
+            def view(request):
+                for pk in Word.objects.values_list('pk', flat=True)[:count]:
+                    Translation.objects.filter(object_id=pk).first()
+                return HttpResponse()
+            return QueryInstrumentationMiddleware(view)
+
+        with self.assertNoLogs('spanglish.instrumentation', 'WARNING'):
+            n_plus_one(3)(RequestFactory().get('/words/'))
+        with self.assertLogs('spanglish.instrumentation', 'WARNING') as logs:
+            n_plus_one(4)(RequestFactory().get('/words/'))
+        [message] = logs.output
+        self.assertIn('GET /words/ ran the same query 4 times (possible N+1)', message)
+        self.assertIn('"object_id" = ?', message)
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_fast_renderer(self):
+        data = {'text': 'e-mail\u2028', 'ratio': 0.5, 'items': [1, None, True]}
+        with mock.patch.object(JSONRenderer, 'render') as fallback:
+            rendered = FastJSONRenderer().render(data)
+        fallback.assert_not_called()
+        self.assertEqual(rendered, JSONRenderer().render(data))
+
+    def test_values_rows_match_serializers(self):
+        for url in ['/dictionary/words/?page_size=20', '/dictionary/sentences/', '/dictionary/translations/?page_size=20',
+                    '/dictionary/translations/?content_type=word&object_id=1']:
+            with override_settings(DICTIONARY_FAST_LISTS=False):
+                expected = self.client.get(url).content
+            cache.clear()
+            response = self.client.get(url)
+            self.assertEqual(response.content, expected, url)
+            self.assertEqual(FastJSONRenderer().render(response.json()), JSONRenderer().render(response.json()))
+            cache.clear()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        word = Word.objects.create(text='hablar', category=WordCategory.VERB)
+        Translation.objects.create(content_object=word, language='en', text='to speak')
+        verb = Verb.objects.create(word=word)
+        VerbConjugation.objects.create(verb=verb, tense=VerbTense.PRESENT, person=VerbPerson.FIRST_SINGULAR, conjugated_form='hablo')
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(DICTIONARY_EXPORT_DIR=directory.name))
+
+    def test_pack(self):
+        response = self.client.get('/dictionary/export/')
+        self.assertNotIsInstance(response, FileResponse)
+        lines = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual([line['type'] for line in lines], ['header', 'word', 'verb'])
+        self.assertEqual(lines[1]['translations'], [{'id': lines[1]['translations'][0]['id'], 'language': 'en', 'text': 'to speak'}])
+        self.assertEqual(lines[2]['conjugations'][0]['conjugated_form'], 'hablo')
+
+        # The second download is the cached file, and a matching ETag skips it entirely
+        cached = self.client.get('/dictionary/export/')
+        self.assertIsInstance(cached, FileResponse)
+        cached.close()
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(self.client.get('/dictionary/export/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+    def test_only_older_packs_are_removed(self):
+        directory = export.export_dir()
+        version = int(export.content_version())
+        older, newer = export.pack_path(version - 1), export.pack_path(version + 1)
+        for path in (older, newer):
+            path.write_bytes(b'')
+        path = export.build_pack()
+        self.assertEqual(export.pack_version(path), version)
+        # A newer pack was published by a concurrent build and must survive
+        self.assertEqual(sorted(directory.iterdir()), sorted([path, newer]))
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_pack_is_read_from_the_primary(self):
+        # 'replica1' is not configured here: any read routed to it would fail
+        blocks = ReplicaPinningMiddleware(lambda request: list(export.stream_pack()))(RequestFactory().get('/'))
+        lines = gzip.decompress(b''.join(blocks)).splitlines()
+        self.assertEqual(json.loads(lines[0])['version'], export.content_version())
+        self.assertEqual(len(lines), 3)
+
+class ChangesTests(TestCase):
+    def test_feed(self):
+        basics = Category.objects.create(name='basics')
+        word = Word.objects.create(text='hablar', category=WordCategory.VERB)
+        since = ChangeLog.objects.latest('seq').seq
+
+        word.text = 'Hablar'
+        word.save()
+        word.categories.add(basics)
+        translation = Translation.objects.create(content_object=word, language='en', text='to speak')
+        basics_id = basics.pk
+        basics.delete()
+
+        response = self.client.get('/dictionary/changes/', {'since': since})
+        data = response.json()
+        changes = [(change['action'], change['model'], change['id']) for change in data['results']]
+        # The word's three updates are compacted into its latest entry
+        self.assertEqual(changes, [
+            ('U', 'word', word.pk), ('I', 'translation', translation.pk), ('D', 'category', basics_id),
+        ])
+        self.assertEqual(data['results'][0]['object']['text'], 'Hablar')
+        self.assertEqual(data['results'][0]['object']['translations'][0]['text'], 'to speak')
+        self.assertEqual((data['since'], data['has_more']), (data['results'][-1]['seq'], False))
+        self.assertEqual(ChangeLog.objects.filter(model='word', object_id=word.pk).count(), 1)
+
+        page = self.client.get('/dictionary/changes/', {'since': since, 'limit': 2}).json()
+        self.assertTrue(page['has_more'])
+        rest = self.client.get('/dictionary/changes/', {'since': page['since']}).json()
+        self.assertEqual([change['model'] for change in rest['results']], ['category'])
+
+    def test_bulk_writes(self):
+        response = self.client.post(
+            '/dictionary/words/bulk/', {'create': [{'text': 'comer', 'category': 'verb'}]}, content_type='application/json',
+        )
+        word_id = response.json()['created'][0]['id']
+        self.assertTrue(ChangeLog.objects.filter(model='word', object_id=word_id, action='I').exists())
+
+
+class ConjugationTests(TestCase):
+    def test_regular_forms(self):
+        self.assertEqual(regular_forms('hablar')[(VerbTense.IMPERFECT, VerbPerson.FIRST_PLURAL)], 'hablábamos')
+        self.assertEqual(regular_forms('vivir')[(VerbTense.PRESENT, VerbPerson.SECOND_PLURAL)], 'vivís')
+        self.assertEqual(regular_forms('buscar')[(VerbTense.PRETERITE, VerbPerson.FIRST_SINGULAR)], 'busqué')
+        self.assertEqual(regular_forms('coger')[(VerbTense.PRESENT, VerbPerson.FIRST_SINGULAR)], 'cojo')
+        self.assertNotIn((VerbTense.PAST, VerbPerson.FIRST_SINGULAR), regular_forms('hablar'))
+        self.assertEqual(len(regular_forms('reír')), 0)
+
+    def test_only_overrides_are_stored(self):
+        word = Word.objects.create(text='pensar', category=WordCategory.VERB)
+        # A complete table: the rules' forms with one override
+        conjugations = [
+            {'tense': tense, 'person': person, 'conjugated_form': 'pienso' if (tense, person) == ('present', '1s') else form}
+            for (tense, person), form in regular_forms('pensar').items()
+        ]
+        response = self.client.post(
+            '/dictionary/verbs/', {'word': word.pk, 'conjugations': conjugations}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        verb = Verb.objects.get(word=word)
+        self.assertEqual(list(verb.conjugations.values_list('conjugated_form', flat=True)), ['pienso'])
+
+        forms = {(c['tense'], c['person']): c for c in response.json()['conjugations']}
+        self.assertEqual(len(forms), 36)
+        self.assertEqual(forms['present', '1s']['conjugated_form'], 'pienso')
+        self.assertEqual(forms['present', '1p'], {'id': None, 'tense': 'present', 'person': '1p', 'conjugated_form': 'pensamos'})
+
+        results = self.client.get('/dictionary/verbs/lookup/', {'form': ['Pensaríamos', 'pienso', 'penso']}).json()['results']
+        self.assertEqual([(m['tense'], m['person']) for m in results['Pensaríamos']], [('conditional', '1p')])
+        self.assertEqual([m['conjugated_form'] for m in results['pienso']], ['pienso'])
+        # 'penso' is not the overridden present form, but it is the unaccented preterite pensó
+        self.assertEqual([(m['tense'], m['conjugated_form']) for m in results['penso']], [('preterite', 'pensó')])
+
+
+    def test_partial_tables_are_kept_as_given(self):
+        word = Word.objects.create(text='tener', category=WordCategory.VERB)
+        conjugations = [
+            {'tense': 'present', 'person': '1s', 'conjugated_form': 'tengo'},
+            {'tense': 'present', 'person': '1p', 'conjugated_form': 'tenemos'},
+        ]
+        response = self.client.post(
+            '/dictionary/verbs/', {'word': word.pk, 'conjugations': conjugations}, content_type='application/json',
+        )
+        verb = Verb.objects.get(word=word)
+        self.assertFalse(verb.derive_regular)
+        self.assertEqual([c['conjugated_form'] for c in response.json()['conjugations']], ['tengo', 'tenemos'])
+        # No regular forms are guessed for it, e.g. "teno"
+        results = self.client.get('/dictionary/verbs/lookup/', {'form': ['teno', 'tenemos']}).json()['results']
+        self.assertEqual(results['teno'], [])
+        self.assertEqual([m['verb'] for m in results['tenemos']], [verb.pk])
+
+    def test_prune_only_complete_tables(self):
+        tables = {'tener': {('present', '1s'): 'tengo', ('present', '1p'): 'tenemos'}}
+        tables['hablar'] = {**regular_forms('hablar'), ('past', '1s'): 'hablé'}
+        verbs = {}
+        for infinitive, table in tables.items():
+            verbs[infinitive] = Verb.objects.create(word=Word.objects.create(text=infinitive, category=WordCategory.VERB))
+            VerbConjugation.objects.bulk_create(
+                VerbConjugation(verb=verbs[infinitive], tense=tense, person=person, conjugated_form=form)
+                for (tense, person), form in table.items()
+            )
+        call_command('prune_regular_conjugations', stdout=io.StringIO())
+
+        hablar, tener = (Verb.objects.get(pk=verbs[name].pk) for name in ('hablar', 'tener'))
+        self.assertTrue(hablar.derive_regular)
+        self.assertEqual(list(hablar.conjugations.values_list('conjugated_form', flat=True)), ['hablé'])
+        self.assertFalse(tener.derive_regular)
+        self.assertEqual(tener.conjugations.count(), 2)
+        # The pruned verb still returns its full table
+        response = self.client.get(f'/dictionary/verbs/{hablar.pk}/').json()
+        self.assertEqual(len(response['conjugations']), len(tables['hablar']))
+
+    def test_updates_are_diffed(self):
+        word = Word.objects.create(text='pensar', category=WordCategory.VERB)
+        verb = Verb.objects.create(word=word)
+        kept, changed, removed = VerbConjugation.objects.bulk_create(
+            VerbConjugation(verb=verb, tense='present', person=person, conjugated_form=form, normalized_form=form)
+            for person, form in (('1s', 'pienso'), ('2s', 'piensas'), ('3s', 'piensa'))
+        )
+        url = f'/dictionary/verbs/{verb.pk}/'
+        cache.clear()
+        self.client.get(url)  # cached before the update
+        since = ChangeLog.objects.latest('seq').seq
+
+        conjugations = [
+            {'tense': 'present', 'person': '1s', 'conjugated_form': 'pienso'},
+            {'tense': 'present', 'person': '2s', 'conjugated_form': 'piénsas'},
+            {'tense': 'present', 'person': '3p', 'conjugated_form': 'piensan'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'conjugations': conjugations}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        # One statement per kind of change
+        writes = [re.match(r'(INSERT INTO|UPDATE|DELETE FROM) "dictionary_verbconjugation"', q['sql']) for q in queries]
+        self.assertEqual([w[1] for w in writes if w], ['DELETE FROM', 'UPDATE', 'INSERT INTO'])
+
+        stored = {c.person: c for c in verb.conjugations.all()}
+        self.assertEqual((stored['1s'].pk, stored['2s'].pk), (kept.pk, changed.pk))
+        self.assertEqual(stored['2s'].normalized_form, 'piensas')
+        self.assertNotIn('3s', stored)
+
+        # Every changed row reaches the change feed, the unchanged one does not
+        log = dict(ChangeLog.objects.filter(model='verbconjugation', seq__gt=since).values_list('object_id', 'action'))
+        self.assertEqual(log, {changed.pk: 'U', removed.pk: 'D', stored['3p'].pk: 'I'})
+        # The form lookup index and the cached verb follow the update
+        results = self.client.get('/dictionary/verbs/lookup/', {'form': ['piensas', 'piensan']}).json()['results']
+        self.assertEqual([m['conjugated_form'] for m in results['piensas']], ['piénsas'])
+        self.assertEqual([(m['person'], m['conjugated_form']) for m in results['piensan']], [('3p', 'piensan')])
+        # A partial table is returned as stored, without computed forms
+        forms = {(c['tense'], c['person']): c['conjugated_form'] for c in self.client.get(url).json()['conjugations']}
+        self.assertEqual(forms, {('present', '1s'): 'pienso', ('present', '2s'): 'piénsas', ('present', '3p'): 'piensan'})
+
+
+@skipUnless(connection.vendor == 'sqlite', "The full-text index is SQLite-only")
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.song = Word.objects.create(text='canción', category=WordCategory.NOUN)
+        Translation.objects.create(content_object=cls.song, language='en', text='song')
+        for i in range(50):
+            Word.objects.create(text=f'palabra{i}', category=WordCategory.NOUN)
+
+    def hits(self, query):
+        response = self.client.get('/dictionary/search/', {'q': query})
+        return [(hit['type'], hit['text']) for hit in response.json()['results']]
+
+    def plan(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_accent_insensitive_prefixes(self):
+        self.assertEqual(self.hits('cancion'), [('word', 'canción')])
+        self.assertEqual(self.hits('CANC'), [('word', 'canción')])
+        self.assertEqual(self.hits('son'), [('translation', 'song')])
+        self.assertEqual(self.hits('cancion song'), [])
+
+    def test_lookups_use_the_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            search.search('cancion')
+        # FTS5 reports the constraints it serves as "<n>:<ops>": M is MATCH, = a rowid lookup
+        self.assertRegex(self.plan(queries[0]['sql']), r'SCAN dictionary_search VIRTUAL TABLE INDEX \d+:M')
+        # Re-indexing and removing a row find it by rowid
+        delete = f"DELETE FROM {search.TABLE} WHERE rowid = %s"
+        self.assertRegex(self.plan(delete, [search.rowid('word', self.song.pk)]), r'VIRTUAL TABLE INDEX \d+:=')
+        plan = Word.objects.filter(pk__in=search.matching('word', 'cancion')).explain()
+        self.assertRegex(plan, r'dictionary_search VIRTUAL TABLE INDEX \d+:M')
+        self.assertIsNone(re.search(r'SCAN dictionary_word\b', plan), plan)
+
+    def test_signals_keep_the_index_in_sync(self):
+        self.song.text = 'canto'
+        self.song.save()
+        self.assertEqual(self.hits('cancion'), [])
+        self.assertEqual(self.hits('canto'), [('word', 'canto')])
+        self.song.delete()
+        self.assertEqual(self.hits('canto'), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', "Admin search goes through the SQLite full-text index")
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        for text in ('canción', 'cantar', 'mesa', 'meseta'):
+            word = Word.objects.create(text=text, category=WordCategory.VERB if text.endswith('ar') else WordCategory.NOUN)
+            Translation.objects.create(content_object=word, language='en', text=f'{text} (en)')
+        sentence = Sentence.objects.create(text='Canto una canción.')
+        Translation.objects.create(content_object=sentence, language='en', text='I sing a song.')
+        verb = Verb.objects.create(word=Word.objects.get(text='cantar'))
+        VerbConjugation.objects.create(verb=verb, tense=VerbTense.PAST, person=VerbPerson.FIRST_SINGULAR, conjugated_form='canté')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelists_skip_table_counts(self):
+        with mock.patch.object(EstimatedCountPaginator, 'max_exact_count', 0):
+            for model in ('word', 'sentence', 'translation', 'verb', 'verbconjugation'):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(f'/admin/dictionary/{model}/')
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql']], model)
+            # Related objects come from one prefetch per content type, however long the page
+            with query_budget(7):
+                response = self.client.get('/admin/dictionary/translation/')
+        self.assertContains(response, 'Canto una canción.')
+
+    def test_full_text_search(self):
+        for url, expected in [
+            ('/admin/dictionary/word/?q=cancion', ['canción']),
+            ('/admin/dictionary/word/?q=mes', ['meseta', 'mesa']),
+            ('/admin/dictionary/translation/?q=song', ['I sing a song. (en)']),
+            ('/admin/dictionary/verb/?q=cantar', ['cantar']),
+            ('/admin/dictionary/verbconjugation/?q=CANTE', ['canté']),
+        ]:
+            results = self.client.get(url).context['cl'].result_list
+            self.assertEqual([getattr(obj, 'conjugated_form', None) or str(obj) for obj in results], expected, url)
+
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'dictionary', 'model_name': 'verb', 'field_name': 'word', 'term': 'canta',
+        })
+        self.assertEqual([item['text'] for item in response.json()['results']], ['cantar'])
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def bulk(self, url, payload):
+        return self.client.post(url, payload, content_type='application/json')
+
+    def test_create_update_delete(self):
+        response = self.bulk('/dictionary/categories/bulk/', {'create': [{'name': 'food'}, {'name': 'travel'}]})
+        self.assertEqual(response.status_code, 200)
+        food, travel = response.json()['created']
+        Category.objects.create(name='other')
+
+        response = self.bulk('/dictionary/categories/bulk/', {
+            'create': [{'name': 'sports'}],
+            'update': [{'id': food['id'], 'description': 'Things to eat'}],
+            'delete': [travel['id']],
+        })
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['name'] for c in data['created']], ['sports'])
+        self.assertEqual(data['updated'][0]['description'], 'Things to eat')
+        self.assertEqual(data['deleted'], 1)
+        self.assertEqual(sorted(Category.objects.values_list('name', flat=True)), ['food', 'other', 'sports'])
+
+    def test_verbs_with_conjugations(self):
+        comer, vivir = (Word.objects.create(text=text, category=WordCategory.VERB) for text in ('comer', 'vivir'))
+        response = self.bulk('/dictionary/verbs/bulk/', {'create': [
+            {'word': comer.pk, 'conjugations': [{'tense': 'present', 'person': '1s', 'conjugated_form': 'como'}]},
+            {'word': vivir.pk, 'conjugations': []},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        created = response.json()['created']
+        self.assertEqual([c['conjugated_form'] for c in created[0]['conjugations']], ['como'])
+        stored = VerbConjugation.objects.get(verb_id=created[0]['id'])
+        self.assertEqual(stored.normalized_form, 'como')
+
+        response = self.bulk('/dictionary/verbs/bulk/', {
+            'update': [{'id': created[0]['id'], 'conjugations': [
+                {'tense': 'present', 'person': '1s', 'conjugated_form': 'como'},
+                {'tense': 'past', 'person': '1s', 'conjugated_form': 'comí'},
+            ]}],
+            'delete': [created[1]['id']],
+        })
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['conjugated_form'] for c in data['updated'][0]['conjugations']], ['como', 'comí'])
+        self.assertEqual(data['deleted'], 1)
+        # The unchanged form keeps its row; the new one is in the change feed
+        self.assertTrue(VerbConjugation.objects.filter(pk=stored.pk, conjugated_form='como').exists())
+        added = VerbConjugation.objects.get(verb_id=created[0]['id'], tense='past')
+        self.assertTrue(ChangeLog.objects.filter(model='verbconjugation', object_id=added.pk, action='I').exists())
+
+    def test_bare_list_creates(self):
+        response = self.bulk('/dictionary/words/bulk/', [{'text': 'comer', 'category': 'verb'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'][0]['text'], 'comer')
+        self.assertEqual(self.bulk('/dictionary/words/bulk/', 'comer').status_code, 400)
+
+    def test_validation_errors_write_nothing(self):
+        word = Word.objects.create(text='comer', category=WordCategory.VERB)
+        response = self.bulk('/dictionary/words/bulk/', {
+            'create': [{'text': 'beber', 'category': 'verb'}, {'text': 'vivir', 'category': 'nope'}],
+            'update': [{'id': word.pk, 'text': 'Comer'}, {'id': 999999, 'text': 'x'}],
+            'delete': [word.pk],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['create']), ['1'])
+        self.assertEqual(response.json()['update']['1'], {'id': ['Not found.']})
+        self.assertEqual(list(Word.objects.values_list('text', flat=True)), ['comer'])
+
+    def test_duplicates_within_the_batch(self):
+        existing = Category.objects.create(name='food')
+        response = self.bulk('/dictionary/categories/bulk/', {
+            'create': [{'name': 'travel'}, {'name': 'sports'}, {'name': 'travel'}],
+            'update': [{'id': existing.pk, 'name': 'sports'}],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['create']), ['2'])
+        self.assertIn('name', response.json()['create']['2'])
+        self.assertEqual(list(response.json()['update']), ['0'])
+        self.assertEqual(list(Category.objects.values_list('name', flat=True)), ['food'])
+
+    def test_deleted_counts_only_the_model(self):
+        word = Word.objects.create(text='comer', category=WordCategory.VERB)
+        Translation.objects.create(content_object=word, language='en', text='to eat')
+        Translation.objects.create(content_object=word, language='fr', text='manger')
+        response = self.bulk('/dictionary/words/bulk/', {'delete': [word.pk]})
+        self.assertEqual(response.json()['deleted'], 1)
+        self.assertFalse(Translation.objects.exists())
+
+
+class ImportTests(TestCase):
+    def test_bad_records_are_reported(self):
+        records = [
+            {'text': 'hablar', 'category': 'verb', 'translations': ['to speak']},
+            {'text': 5, 'category': 'noun'},
+            {'text': 'mesa', 'category': 'noun', 'categories': [1]},
+            {'text': 'comer', 'category': 'verb', 'conjugations': {'present': 'x'}},
+            {'text': 'casa', 'category': 'noun', 'categories': ['home'], 'translations': {'en': 'house'}},
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'words.jsonl'
+        path.write_text('\n'.join(json.dumps(record) for record in records))
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_dictionary', str(path), batch_size=2, stdout=stdout, stderr=stderr)
+        self.assertEqual([line.split(':')[0] for line in stderr.getvalue().splitlines()], ['row 1', 'row 2', 'row 3', 'row 4'])
+        self.assertIn('Imported 1 rows', stdout.getvalue())
+        self.assertEqual(list(Word.objects.values_list('text', flat=True)), ['casa'])
+        self.assertEqual(Translation.objects.get().text, 'house')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRoutingTests(TestCase):
+    replicas = {'replica1', 'replica2'}
+
+    def in_request(self, view, method='get'):
+        """Call `view()` the way ReplicaPinningMiddleware runs a request."""
+        return ReplicaPinningMiddleware(lambda request: view())(getattr(RequestFactory(), method)('/'))
+
+    def test_dictionary_reads_go_to_replicas(self):
+        aliases = self.in_request(lambda: {
+            model: router.db_for_read(model) for model in (Word, Translation, VerbConjugation, get_user_model())
+        })
+        self.assertLessEqual({aliases[Word], aliases[Translation], aliases[VerbConjugation]}, self.replicas)
+        # Other apps always use the primary
+        self.assertEqual(aliases[get_user_model()], 'default')
+        self.assertEqual(router.db_for_write(Word), 'default')
+
+    def test_writes_pin_later_reads_to_the_primary(self):
+        def view():
+            before = Word.objects.all().db
+            word = Word.objects.create(text='leer', category=WordCategory.VERB)
+            # Runs on the alias the router picks, so it only finds the word on the primary
+            found = Word.objects.get(pk=word.pk).text
+            return before, Word.objects.all().db, router.db_for_read(Translation), found
+
+        before, after, translations, found = self.in_request(view)
+        self.assertIn(before, self.replicas)
+        self.assertEqual((after, translations, found), ('default', 'default', 'leer'))
+        # The pin ends with the request
+        self.assertIn(self.in_request(lambda: Word.objects.all().db), self.replicas)
+
+    def test_unsafe_requests_read_from_the_primary(self):
+        # Their reads (get_object(), the rows a bulk write or diff is based on) must not be stale
+        for method in ('post', 'put', 'patch', 'delete'):
+            self.assertEqual(self.in_request(lambda: Word.objects.all().db, method), 'default', method)
+        self.assertIn(self.in_request(lambda: Word.objects.all().db, 'head'), self.replicas)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_pinned_responses_are_not_cached(self):
+        cache.clear()
+        Word.objects.create(text='leer', category=WordCategory.VERB)
+        with mock.patch('spanglish.routers.is_pinned', return_value=True):
+            self.client.get('/dictionary/words/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/dictionary/words/')
+        self.assertTrue(queries.captured_queries)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/dictionary/words/')
+        self.assertFalse(queries.captured_queries)
@@ -1,5 +1,7 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import WordViewSet, VerbViewSet, SentenceViewSet, TranslationViewSet, CategoryViewSet
+from .views import WordViewSet, VerbViewSet, SentenceViewSet, TranslationViewSet, CategoryViewSet, SearchViewSet, ChangesViewSet, ExportViewSet
+from .async_views import WordAsyncView, VerbAsyncView, SentenceAsyncView, TranslationAsyncView
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
@@ -7,5 +9,22 @@ router.register(r'words', WordViewSet)
 router.register(r'verbs', VerbViewSet)
 router.register(r'sentences', SentenceViewSet)
 router.register(r'translations', TranslationViewSet)
+router.register(r'search', SearchViewSet, basename='search')
+router.register(r'changes', ChangesViewSet, basename='changes')
+router.register(r'export', ExportViewSet, basename='export')
+
+# Async (ASGI) read-only endpoints
+async_urlpatterns = []
+for prefix, view in [
+    ('words', WordAsyncView),
+    ('verbs', VerbAsyncView),
+    ('sentences', SentenceAsyncView),
+    ('translations', TranslationAsyncView),
+]:
+    async_urlpatterns += [
+        path(f'async/{prefix}/', view.as_view(), name=f'async-{prefix}-list'),
+        path(f'async/{prefix}/<int:pk>/', view.as_view(), name=f'async-{prefix}-detail'),
+    ]
+
+urlpatterns = router.urls + async_urlpatterns
 
-urlpatterns = router.urls
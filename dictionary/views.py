@@ -1,28 +1,125 @@
-from rest_framework import viewsets
-from .models import Word, Verb, Sentence, Translation, Category
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+from .models import Word, Verb, Sentence, Translation, Category, VerbConjugation, WordCategory, fold_text
+from .cache import CachedReadMixin
 from django.contrib.contenttypes.models import ContentType
 from .serializers import WordSerializer, VerbSerializer, SentenceSerializer, TranslationSerializer, CategorySerializer
+from .mixins import BulkWriteMixin, ValuesListMixin
+from . import changes, conjugation, export, search
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedReadMixin, BulkWriteMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = (Category,)
 
 
-class WordViewSet(viewsets.ModelViewSet):
-    queryset = Word.objects.all()
+def translations_prefetch():
+    """Prefetch translations together with their content type in one query, in pk order."""
+    return Prefetch('translations', queryset=Translation.objects.select_related('content_type').order_by('pk'))
+
+
+def related_prefetch(lookup, model):
+    """Prefetch a many-to-many relation in pk order, the order the values() list rows use."""
+    return Prefetch(lookup, queryset=model.objects.order_by('pk'))
+
+
+class WordViewSet(CachedReadMixin, ValuesListMixin, BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = Word.objects.prefetch_related(translations_prefetch(), related_prefetch('categories', Category))
     serializer_class = WordSerializer
+    cache_dependencies = (Word, Translation, Category)
 
-class VerbViewSet(viewsets.ModelViewSet):
-    queryset = Verb.objects.all()
+class VerbViewSet(CachedReadMixin, BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = Verb.objects.select_related('word').prefetch_related('conjugations')
     serializer_class = VerbSerializer
+    # Word: regular forms are computed from the infinitive
+    cache_dependencies = (Verb, VerbConjugation, Word)
+    max_lookup_forms = 500
+
+    # Bulk writes: the verbs go through the mixin, their nested conjugations through
+    # VerbSerializer.sync_conjugations, which diffs each verb's set on its own.
+    def bulk_create_objects(self, model, items):
+        items = [dict(data) for data in items]
+        conjugations = [data.pop('conjugations', []) for data in items]
+        verbs = super().bulk_create_objects(model, items)
+        serializer = self.get_serializer()
+        for verb, conj_data in zip(verbs, conjugations):
+            serializer.sync_conjugations(verb, conj_data, current={})
+        return verbs
 
-class SentenceViewSet(viewsets.ModelViewSet):
-    queryset = Sentence.objects.all()
+    def bulk_update_objects(self, model, items):
+        items = [(instance, dict(data)) for instance, data in items]
+        conjugations = [data.pop('conjugations', None) for _, data in items]
+        verbs = super().bulk_update_objects(model, items)
+        # The stored sets the updates are diffed against, for all verbs at once
+        prefetch_related_objects(verbs, 'word', 'conjugations')
+        serializer = self.get_serializer()
+        for verb, conj_data in zip(verbs, conjugations):
+            if conj_data is not None:
+                serializer.sync_conjugations(verb, conj_data)
+        return verbs
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Reverse conjugation lookup: which verb, tense and person produce a form?
+        GET /dictionary/verbs/lookup/?form=hablaríamos[&form=comí...]
+        Matching is accent- and case-insensitive. Stored forms are answered from an
+        index; regular forms by analysing the form and looking the candidate
+        infinitives up in Word.text, among the verbs whose regular forms are derived.
+        """
+        forms = request.query_params.getlist('form')[:self.max_lookup_forms]
+        folded = {form: fold_text(form) for form in forms}
+        matches = VerbConjugation.objects.filter(normalized_form__in=set(folded.values())).values(
+            'normalized_form', 'conjugated_form', 'tense', 'person', 'verb_id', 'verb__word_id', 'verb__word__text',
+        )
+        by_form = {}
+        for match in matches:
+            by_form.setdefault(match['normalized_form'], []).append({
+                'conjugated_form': match['conjugated_form'],
+                'tense': match['tense'],
+                'person': match['person'],
+                'verb': match['verb_id'],
+                'word': {'id': match['verb__word_id'], 'text': match['verb__word__text']},
+            })
+
+        analyses = {key: conjugation.analyze(key) for key in set(folded.values())}
+        infinitives = {infinitive for found in analyses.values() for infinitive, _, _ in found}
+        verbs = {
+            text: (verb_id, word_id)
+            for text, verb_id, word_id in Word.objects.filter(
+                text__in=infinitives, category=WordCategory.VERB, verb_info__derive_regular=True,
+            ).values_list('text', 'verb_info', 'id')
+        }
+        # A stored conjugation overrides the computed form of its tense and person
+        overridden = set(VerbConjugation.objects.filter(
+            verb_id__in=[verb_id for verb_id, _ in verbs.values()],
+        ).values_list('verb_id', 'tense', 'person'))
+        for key, found in analyses.items():
+            for infinitive, tense, person in sorted(found):
+                if infinitive not in verbs or (verbs[infinitive][0], tense, person) in overridden:
+                    continue
+                verb_id, word_id = verbs[infinitive]
+                by_form.setdefault(key, []).append({
+                    'conjugated_form': conjugation.regular_form(infinitive, tense, person),
+                    'tense': tense,
+                    'person': person,
+                    'verb': verb_id,
+                    'word': {'id': word_id, 'text': infinitive},
+                })
+        return Response({'results': {form: by_form.get(key, []) for form, key in folded.items()}})
+
+class SentenceViewSet(CachedReadMixin, ValuesListMixin, BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = Sentence.objects.prefetch_related(translations_prefetch(), related_prefetch('related_words', Word))
     serializer_class = SentenceSerializer
+    cache_dependencies = (Sentence, Translation, Word)
 
-class TranslationViewSet(viewsets.ModelViewSet):
-    queryset = Translation.objects.all()
+class TranslationViewSet(ValuesListMixin, BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = Translation.objects.select_related('content_type')
     serializer_class = TranslationSerializer
 
     def get_queryset(self):
@@ -41,4 +138,70 @@ class TranslationViewSet(viewsets.ModelViewSet):
                 except ContentType.DoesNotExist:
                     queryset = queryset.none()
 
-            return queryset
\ No newline at end of file
+            return queryset
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Ranked, accent-insensitive prefix search over words, sentences and translations.
+    GET /dictionary/search/?q=cancion[&type=word&type=sentence][&limit=20]
+    """
+    max_limit = 100
+
+    def list(self, request):
+        query = request.query_params.get('q', '')
+        kinds = request.query_params.getlist('type') or None
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        return Response({'results': search.search(query, kinds=kinds, limit=max(limit, 1))})
+
+
+class ChangesViewSet(viewsets.ViewSet):
+    """
+    Changes since a sequence number, for clients that keep an offline copy.
+    GET /dictionary/changes/?since=<seq>[&limit=500]
+
+    Start from the `version` in the header of the offline pack and pass the
+    returned `since` back until `has_more` is false.
+    """
+    max_limit = 1000
+
+    def list(self, request):
+        try:
+            since = max(int(request.query_params.get('since', 0)), 0)
+            limit = min(max(int(request.query_params.get('limit', 500)), 1), self.max_limit)
+        except ValueError:
+            return Response({"detail": "'since' and 'limit' must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        results, has_more = changes.changes_since(since, limit)
+        return Response({
+            'results': results,
+            'since': results[-1]['seq'] if results else since,
+            'has_more': has_more,
+        })
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    The whole dictionary as a gzip-compressed NDJSON download, for offline use.
+    GET /dictionary/export/ (send the ETag back as If-None-Match to skip unchanged packs)
+    """
+
+    def list(self, request):
+        version = export.content_version()
+        etag = quote_etag(version)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        path = export.pack_path(version)
+        try:
+            response = FileResponse(path.open('rb'), content_type=export.CONTENT_TYPE)
+        except FileNotFoundError:
+            # Not built yet for this version: stream it while it is written to disk
+            response = StreamingHttpResponse(export.stream_pack(), content_type=export.CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="{path.name}"'
+        response['ETag'] = etag
+        return response
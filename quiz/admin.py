@@ -1,3 +1,45 @@
 from django.contrib import admin
+from spanglish.admin import ScalableModelAdmin
+from .models import CategoryProgress, Quiz, QuizQuestion, ReviewState, UserProgress
 
-# Register your models here.
+
+@admin.register(Quiz)
+class QuizAdmin(ScalableModelAdmin):
+    list_display = ('id', 'user', 'category', 'score', 'total_questions', 'success', 'created_at', 'submitted_at')
+    list_filter = ('success',)
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('user',)
+
+
+@admin.register(QuizQuestion)
+class QuizQuestionAdmin(ScalableModelAdmin):
+    list_display = ('id', 'quiz', 'content_object', 'is_correct', 'answered_at')
+    list_filter = ('is_correct',)
+    list_select_related = ('quiz__user',)
+    raw_id_fields = ('quiz',)
+    prefetch_generic = ('content_object',)
+
+
+class CategoryProgressInline(admin.TabularInline):
+    model = CategoryProgress
+    extra = 0
+
+
+@admin.register(UserProgress)
+class UserProgressAdmin(ScalableModelAdmin):
+    list_display = ('user', 'quizzes_taken', 'questions_answered', 'rolling_accuracy', 'current_streak', 'best_streak', 'last_quiz_date')
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('user',)
+
+    inlines = [CategoryProgressInline]
+
+
+@admin.register(ReviewState)
+class ReviewStateAdmin(ScalableModelAdmin):
+    list_display = ('user', 'content_object', 'due_at', 'interval', 'ease', 'repetitions')
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('user',)
+    prefetch_generic = ('content_object',)
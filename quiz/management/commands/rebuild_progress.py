@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from quiz.models import CategoryProgress, Quiz, QuizQuestion, UserProgress
+from quiz.progress import record_quiz
+
+
+class Command(BaseCommand):
+    help = "Recompute every learner's progress statistics from their submitted quizzes."
+
+    def handle(self, *args, **options):
+        answered = Prefetch('questions', queryset=QuizQuestion.objects.filter(answered_at__isnull=False))
+        quizzes = Quiz.objects.filter(submitted_at__isnull=False).order_by('submitted_at', 'pk')
+        count = 0
+        with transaction.atomic():
+            CategoryProgress.objects.all().delete()
+            UserProgress.objects.all().delete()
+            for quiz in quizzes.prefetch_related(answered).iterator(chunk_size=500):
+                record_quiz(quiz, list(quiz.questions.all()), quiz.submitted_at)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Replayed {count} quizzes"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('quiz', '0002_quiz_submitted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizquestion',
+            index=models.Index(fields=['quiz', 'is_correct'], name='quizquestion_quiz_correct_idx'),
+        ),
+    ]
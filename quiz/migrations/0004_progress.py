@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quizzes_taken', models.PositiveIntegerField(default=0)),
+                ('questions_answered', models.PositiveIntegerField(default=0)),
+                ('correct_answers', models.PositiveIntegerField(default=0)),
+                ('rolling_accuracy', models.FloatField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('best_streak', models.PositiveIntegerField(default=0)),
+                ('last_quiz_date', models.DateField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategoryProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('word_category', 'Part of speech'), ('category', 'Category')], max_length=20)),
+                ('key', models.CharField(max_length=100)),
+                ('answered', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('progress', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to='quiz.userprogress')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('progress', 'kind', 'key'), name='categoryprogress_unique')],
+            },
+        ),
+    ]
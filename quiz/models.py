@@ -13,6 +13,7 @@ class Quiz(models.Model):
     score = models.PositiveIntegerField(default=0)
     total_questions = models.PositiveIntegerField(default=0)
     success = models.BooleanField(default=False)
+    submitted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"Quiz {self.id} - {self.user.username} - {self.category or 'All'}"
@@ -29,5 +30,70 @@ class QuizQuestion(models.Model):
     is_correct = models.BooleanField(default=False)
     answered_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'is_correct'], name='quizquestion_quiz_correct_idx'),
+        ]
+
     def __str__(self):
         return f"Q{self.id} - {self.content_object}"
+
+
+class UserProgress(models.Model):
+    """Running totals of a learner's quiz history, updated on every submission."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="progress")
+    quizzes_taken = models.PositiveIntegerField(default=0)
+    questions_answered = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+    rolling_accuracy = models.FloatField(default=0)       # exponential moving average of quiz accuracy
+    current_streak = models.PositiveIntegerField(default=0)  # consecutive days with a submitted quiz
+    best_streak = models.PositiveIntegerField(default=0)
+    last_quiz_date = models.DateField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Progress of {self.user.username}"
+
+
+class CategoryProgress(models.Model):
+    class Kind(models.TextChoices):
+        WORD_CATEGORY = 'word_category', 'Part of speech'
+        CATEGORY = 'category', 'Category'
+
+    progress = models.ForeignKey(UserProgress, related_name='categories', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    key = models.CharField(max_length=100)  # a WordCategory value or a Category name
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['progress', 'kind', 'key'], name='categoryprogress_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.progress.user.username} - {self.key}: {self.correct}/{self.answered}"
+
+
+class ReviewState(models.Model):
+    """Spaced-repetition schedule (SM-2) of one word or sentence for one learner."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="review_states")
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    ease = models.FloatField(default=2.5)
+    interval = models.PositiveIntegerField(default=0)     # days until the next review
+    repetitions = models.PositiveIntegerField(default=0)  # correct answers in a row
+    due_at = models.DateTimeField(default=timezone.now)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'content_type', 'object_id'], name='reviewstate_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'due_at'], name='reviewstate_user_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.content_object} due {self.due_at:%Y-%m-%d}"
@@ -0,0 +1,84 @@
+"""
+Incrementally maintained learner statistics.
+
+`record_quiz()` folds one submitted quiz into the learner's `UserProgress` row
+and their per-category `CategoryProgress` rows, so a dashboard reads a handful
+of rows instead of scanning the learner's whole quiz history.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from dictionary.models import Word
+from .models import CategoryProgress, UserProgress
+
+# Weight of the latest quiz in the rolling accuracy
+ROLLING_WEIGHT = 0.2
+
+
+def category_keys(questions):
+    """Map each question about a word to its (kind, key) pairs: part of speech and Category names."""
+    word_ct = ContentType.objects.get_for_model(Word)
+    word_ids = {q.object_id for q in questions if q.content_type_id == word_ct.id}
+    keys = defaultdict(set)
+    rows = Word.objects.filter(pk__in=word_ids).values_list('pk', 'category', 'categories__name')
+    for pk, category, name in rows:
+        keys[pk].add((CategoryProgress.Kind.WORD_CATEGORY, category))
+        if name:
+            keys[pk].add((CategoryProgress.Kind.CATEGORY, name))
+    return {q.pk: keys[q.object_id] for q in questions if q.content_type_id == word_ct.id}
+
+
+def record_quiz(quiz, questions, now=None):
+    """
+    Add a submitted quiz and its graded questions to the learner's statistics.
+    Call it inside the transaction that submits the quiz: the progress row is
+    locked, so concurrent submissions by the same learner are applied in turn.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    progress, _ = UserProgress.objects.select_for_update().get_or_create(user_id=quiz.user_id)
+
+    correct = sum(q.is_correct for q in questions)
+    accuracy = correct / quiz.total_questions if quiz.total_questions else 0.0
+    if progress.quizzes_taken:
+        progress.rolling_accuracy += ROLLING_WEIGHT * (accuracy - progress.rolling_accuracy)
+    else:
+        progress.rolling_accuracy = accuracy
+    progress.quizzes_taken += 1
+    progress.questions_answered += len(questions)
+    progress.correct_answers += correct
+    if progress.last_quiz_date != today:
+        if progress.last_quiz_date == today - timedelta(days=1):
+            progress.current_streak += 1
+        else:
+            progress.current_streak = 1
+        progress.best_streak = max(progress.best_streak, progress.current_streak)
+        progress.last_quiz_date = today
+    progress.save()
+
+    answered, right = Counter(), Counter()
+    keys = category_keys(questions)
+    for question in questions:
+        for key in keys.get(question.pk, ()):
+            answered[key] += 1
+            right[key] += question.is_correct
+    if not answered:
+        return progress
+
+    existing = {
+        (row.kind, row.key): row
+        for row in progress.categories.filter(key__in={key for _, key in answered})
+    }
+    created, updated = [], []
+    for (kind, key), count in answered.items():
+        row = existing.get((kind, key))
+        if row is None:
+            created.append(CategoryProgress(progress=progress, kind=kind, key=key, answered=count, correct=right[kind, key]))
+        else:
+            row.answered += count
+            row.correct += right[kind, key]
+            updated.append(row)
+    CategoryProgress.objects.bulk_create(created)
+    CategoryProgress.objects.bulk_update(updated, ['answered', 'correct'])
+    return progress
@@ -0,0 +1,71 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from django.db.models import Count, Max, Min
+
+# Upper bound on the number of candidate ids sent in a single `IN (...)` lookup.
+MAX_CANDIDATES = 500
+# Below this id density the range strategy wastes most of its probes.
+MIN_DENSITY = 0.2
+
+
+def sample_ids(queryset, k, rounds=3):
+    """
+    Pick up to `k` distinct random primary keys from `queryset` without loading the table.
+
+    Random ids are drawn from the [min, max] primary key range and checked against the
+    queryset in one query per round. When that leaves ids missing (e.g. a narrow category
+    filter whose ids are spread over the whole range), the queryset's ids are read once
+    and the rest are sampled from them in memory.
+    """
+    stats = queryset.aggregate(n=Count('pk'), lo=Min('pk'), hi=Max('pk'))
+    total = stats['n']
+    if not total or k <= 0:
+        return []
+    k = min(k, total)
+
+    picked = set()
+    span = stats['hi'] - stats['lo'] + 1
+    density = total / span
+    if density >= MIN_DENSITY:
+        for _ in range(rounds):
+            missing = k - len(picked)
+            if missing <= 0:
+                break
+            draw = min(span, MAX_CANDIDATES, int(missing / density * 1.5) + 8)
+            candidates = random.sample(range(stats['lo'], stats['hi'] + 1), draw)
+            picked.update(queryset.filter(pk__in=candidates).values_list('pk', flat=True))
+
+    if len(picked) < k:
+        remaining = [pk for pk in queryset.values_list('pk', flat=True) if pk not in picked]
+        picked.update(random.sample(remaining, min(k - len(picked), len(remaining))))
+
+    picked = list(picked)
+    random.shuffle(picked)
+    return picked[:k]
+
+
+def sample_pool(querysets, k):
+    """
+    Sample `k` items uniformly from the union of several querysets.
+
+    Returns a list of `(model, pk)` pairs. Only the row counts are needed to split
+    `k` between the querysets; the ids themselves come from `sample_ids`.
+    """
+    counts = [qs.count() for qs in querysets]
+    total = sum(counts)
+    if not total or k <= 0:
+        return []
+
+    # Draw positions in the virtual concatenation and count how many land in each queryset.
+    ends = list(accumulate(counts))
+    shares = [0] * len(querysets)
+    for position in random.sample(range(total), min(k, total)):
+        shares[bisect_right(ends, position)] += 1
+
+    selected = []
+    for qs, share in zip(querysets, shares):
+        if share:
+            selected.extend((qs.model, pk) for pk in sample_ids(qs, share))
+    random.shuffle(selected)
+    return selected
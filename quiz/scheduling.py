@@ -0,0 +1,113 @@
+"""
+Spaced-repetition scheduling (SM-2) for quiz items.
+
+Every graded answer updates the learner's `ReviewState` for that word or
+sentence. `due_items()` reads the next items to review with a range scan over
+the `(user, due_at)` index, so building a review session costs the same no
+matter how large the vocabulary or the history is.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.utils import timezone
+from .models import ReviewState
+
+MIN_EASE = 1.3
+# SM-2 grades (0-5) given to a right and a wrong answer
+CORRECT_GRADE = 4
+WRONG_GRADE = 1
+# Upper bound on the due reviews read while looking for items that match a quiz's filters
+MAX_DUE_SCAN = 2000
+
+
+def schedule(state, correct, now):
+    """Apply one graded answer to `state` (not saved)."""
+    grade = CORRECT_GRADE if correct else WRONG_GRADE
+    if correct:
+        state.repetitions += 1
+        if state.repetitions == 1:
+            state.interval = 1
+        elif state.repetitions == 2:
+            state.interval = 6
+        else:
+            state.interval = round(state.interval * state.ease)
+    else:
+        state.repetitions = 0
+        state.interval = 1
+    state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    state.due_at = now + timedelta(days=state.interval)
+    state.last_reviewed_at = now
+    return state
+
+
+def record_reviews(user_id, questions, now=None):
+    """
+    Schedule the next review of every graded question. Call it inside the submit
+    transaction, after `progress.record_quiz` has locked the learner's progress row.
+    """
+    now = now or timezone.now()
+    targets = defaultdict(set)
+    for question in questions:
+        targets[question.content_type_id].add(question.object_id)
+    if not targets:
+        return
+
+    lookup = Q()
+    for content_type_id, ids in targets.items():
+        lookup |= Q(content_type_id=content_type_id, object_id__in=ids)
+    states = {
+        (state.content_type_id, state.object_id): state
+        for state in ReviewState.objects.select_for_update().filter(lookup, user_id=user_id)
+    }
+
+    created, updated = [], []
+    for question in questions:
+        key = (question.content_type_id, question.object_id)
+        state = states.get(key)
+        if state is None:
+            state = states[key] = ReviewState(user_id=user_id, content_type_id=key[0], object_id=key[1])
+            created.append(state)
+        elif state.pk and state not in updated:
+            updated.append(state)
+        schedule(state, question.is_correct, now)
+    ReviewState.objects.bulk_create(created)
+    ReviewState.objects.bulk_update(updated, ['ease', 'interval', 'repetitions', 'due_at', 'last_reviewed_at'])
+
+
+def due_queryset(user, models, now=None):
+    """The learner's due reviews of the given models, most overdue first."""
+    now = now or timezone.now()
+    content_types = ContentType.objects.get_for_models(*models).values()
+    return (
+        ReviewState.objects.filter(user=user, due_at__lte=now, content_type__in=content_types)
+        .order_by('due_at', 'pk')
+    )
+
+
+def due_items(user, querysets, k, now=None):
+    """
+    Up to `k` `(model, pk)` pairs from `querysets` whose review is due. The querysets
+    restrict which items qualify (e.g. a category filter): due reviews are read in
+    index order, a batch at a time, and each batch is checked against them, so no
+    more than `MAX_DUE_SCAN` reviews are read whatever the filter.
+    """
+    if k <= 0:
+        return []
+    querysets = {qs.model: qs for qs in querysets}
+    models = {ContentType.objects.get_for_model(model).pk: model for model in querysets}
+    due = due_queryset(user, querysets, now).values_list('content_type_id', 'object_id')
+
+    picked = []
+    batch_size = max(k * 2, 50)
+    for offset in range(0, MAX_DUE_SCAN, batch_size):
+        batch = [(models[content_type_id], pk) for content_type_id, pk in due[offset:offset + batch_size]]
+        allowed = set()
+        for model, qs in querysets.items():
+            ids = [pk for m, pk in batch if m is model]
+            if ids:
+                allowed.update((model, pk) for pk in qs.filter(pk__in=ids).values_list('pk', flat=True))
+        picked.extend(item for item in batch if item in allowed)
+        if len(picked) >= k or len(batch) < batch_size:
+            break
+    return picked[:k]
@@ -1,9 +1,13 @@
+from datetime import timedelta
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
-from .models import Quiz, QuizQuestion
+from .models import Quiz, QuizQuestion, UserProgress, CategoryProgress
 from dictionary.models import Word, Sentence
-import random
+from .progress import record_quiz
+from .sampling import sample_pool
+from .scheduling import due_items, record_reviews
 
 # --- Quiz question serializer ---
 class QuizQuestionSerializer(serializers.ModelSerializer):
@@ -27,65 +31,95 @@ class QuizSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Quiz
-        fields = ['id', 'user', 'category', 'created_at', 'score', 'total_questions', 'success', 'questions']
+        fields = ['id', 'user', 'category', 'created_at', 'submitted_at', 'score', 'total_questions', 'success', 'questions']
 
 
 # --- Create a quiz ---
+# Upper bound for the number of questions in one quiz
+MAX_QUESTIONS = 100
+
+
+def correct_answer_for(item):
+    """Expected answer for a Word/Sentence: its own (Spanish) text."""
+    return {"spanish": item.text.strip()}
+
+
 class QuizCreateSerializer(serializers.Serializer):
-    count = serializers.IntegerField(default=5)
+    MODE_RANDOM = 'random'
+    MODE_DUE = 'due'
+
+    count = serializers.IntegerField(default=5, min_value=1, max_value=MAX_QUESTIONS)
     categories = serializers.ListField(child=serializers.CharField(), required=False)
     include_sentences = serializers.BooleanField(default=False)
+    # 'due' starts with the learner's items that are due for review and fills up with random ones
+    mode = serializers.ChoiceField(choices=[MODE_RANDOM, MODE_DUE], default=MODE_RANDOM)
 
     def create(self, validated_data):
         user = self.context['request'].user
         count = validated_data.get("count", 5)
         categories = validated_data.get("categories", [])
         include_sentences = validated_data.get("include_sentences", False)
+        mode = validated_data.get("mode", self.MODE_RANDOM)
 
-        # Gather words
-        words_qs = Word.objects.all()
+        # Sample ids in the database, then load only the selected rows.
+        # Items without text would have an empty expected answer.
+        words_qs = Word.objects.exclude(text='')
         if categories:
-            words_qs = words_qs.filter(category__name__in=categories)
-        words = list(words_qs)
-
-        # Gather sentences
-        sentences = []
+            words_qs = words_qs.filter(categories__name__in=categories).distinct()
+        pools = [words_qs]
         if include_sentences:
-            sentences_qs = Sentence.objects.all()
-            sentences = list(sentences_qs)
-
-        pool = words + sentences
-        selected = random.sample(pool, min(count, len(pool)))
-
-        # Create quiz
-        quiz = Quiz.objects.create(user=user, total_questions=len(selected))
-
-        for item in selected:
-            if isinstance(item, Word):
-                correct = {"spanish": item.translation}
-                if item.category and item.category.name.lower() == "verb":
-                    correct["conjugated_form"] = item.verb.conjugated_form if hasattr(item, "verb") else None
-                ct = ContentType.objects.get_for_model(Word)
-                QuizQuestion.objects.create(
+            pools.append(Sentence.objects.exclude(text=''))
+        selected = []
+        if mode == self.MODE_DUE:
+            selected = due_items(user, pools, count)
+            pools = [
+                qs.exclude(pk__in=[pk for model, pk in selected if model is qs.model])
+                for qs in pools
+            ]
+        selected += sample_pool(pools, count - len(selected))
+
+        items = {}
+        for model in {model for model, _ in selected}:
+            ids = [pk for m, pk in selected if m is model]
+            items[model] = model.objects.in_bulk(ids)
+        selected = [
+            items[model][pk] for model, pk in selected
+            if pk in items[model] and correct_answer_for(items[model][pk])["spanish"]
+        ]
+
+        # Create quiz and all of its questions in one transaction
+        content_types = ContentType.objects.get_for_models(*items)
+        with transaction.atomic():
+            quiz = Quiz.objects.create(user=user, total_questions=len(selected))
+            QuizQuestion.objects.bulk_create([
+                QuizQuestion(
                     quiz=quiz,
-                    content_type=ct,
+                    content_type=content_types[type(item)],
                     object_id=item.id,
-                    correct_answer=correct
-                )
-            elif isinstance(item, Sentence):
-                correct = {"spanish": item.translation}
-                ct = ContentType.objects.get_for_model(Sentence)
-                QuizQuestion.objects.create(
-                    quiz=quiz,
-                    content_type=ct,
-                    object_id=item.id,
-                    correct_answer=correct
+                    correct_answer=correct_answer_for(item)
                 )
+                for item in selected
+            ])
 
         return quiz
 
 
 # --- Submit quiz answers ---
+def is_correct_answer(correct_answer, user_answer):
+    """
+    Case- and whitespace-insensitive comparison of every expected key. A blank
+    expected value never matches, so a question without an answer can't be passed.
+    """
+    if not isinstance(user_answer, dict) or not correct_answer:
+        return False
+    if any(not str(value).strip() for value in correct_answer.values()):
+        return False
+    return all(
+        str(user_answer.get(key, "")).strip().lower() == str(value).strip().lower()
+        for key, value in correct_answer.items()
+    )
+
+
 class QuizSubmitSerializer(serializers.Serializer):
     answers = serializers.ListField(
         child=serializers.DictField(),
@@ -93,33 +127,79 @@ class QuizSubmitSerializer(serializers.Serializer):
     )
 
     def update(self, instance, validated_data):
-        answers = validated_data.get('answers', [])
-        score = 0
-
-        for ans in answers:
-            question_id = ans.get("question_id")
-            user_answer = ans.get("user_answer")
+        answers = {}
+        for ans in validated_data.get('answers', []):
             try:
-                question = instance.questions.get(id=question_id)
-            except QuizQuestion.DoesNotExist:
+                answers[int(ans.get("question_id"))] = ans.get("user_answer")
+            except (TypeError, ValueError):
                 continue
+        now = timezone.now()
 
+        # Grade every answered question in memory
+        graded = []
+        for question in instance.questions.all():
+            if question.id not in answers:
+                continue
+            user_answer = answers[question.id]
             question.user_answer = user_answer
-            question.answered_at = timezone.now()
-
-            # Check correctness
-            is_correct = True
-            for key, value in question.correct_answer.items():
-                if str(user_answer.get(key, "")).strip().lower() != str(value).strip().lower():
-                    is_correct = False
-                    break
-
-            question.is_correct = is_correct
-            if is_correct:
-                score += 1
-            question.save()
+            question.answered_at = now
+            question.is_correct = is_correct_answer(question.correct_answer, user_answer)
+            graded.append(question)
+        score = sum(question.is_correct for question in graded)
+
+        with transaction.atomic():
+            # Claiming the quiz with a conditional UPDATE rejects double submissions
+            claimed = Quiz.objects.filter(pk=instance.pk, submitted_at__isnull=True).update(
+                score=score,
+                success=(score == instance.total_questions),
+                submitted_at=now,
+            )
+            if not claimed:
+                raise serializers.ValidationError({"detail": "This quiz has already been submitted."})
+            QuizQuestion.objects.bulk_update(graded, ['user_answer', 'answered_at', 'is_correct'])
+            record_quiz(instance, graded, now)
+            record_reviews(instance.user_id, graded, now)
 
         instance.score = score
         instance.success = (score == instance.total_questions)
-        instance.save()
-        return instance
\ No newline at end of file
+        instance.submitted_at = now
+        return instance
+
+
+# --- Learner statistics ---
+class CategoryProgressSerializer(serializers.ModelSerializer):
+    accuracy = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CategoryProgress
+        fields = ['kind', 'key', 'answered', 'correct', 'accuracy']
+
+    def get_accuracy(self, obj):
+        return obj.correct / obj.answered if obj.answered else 0.0
+
+
+class UserProgressSerializer(serializers.ModelSerializer):
+    accuracy = serializers.SerializerMethodField()
+    current_streak = serializers.SerializerMethodField()
+    categories = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserProgress
+        fields = [
+            'quizzes_taken', 'questions_answered', 'correct_answers', 'accuracy', 'rolling_accuracy',
+            'current_streak', 'best_streak', 'last_quiz_date', 'categories',
+        ]
+
+    def get_accuracy(self, obj):
+        return obj.correct_answers / obj.questions_answered if obj.questions_answered else 0.0
+
+    def get_current_streak(self, obj):
+        # A streak survives until the end of the day after the last quiz
+        if obj.last_quiz_date and obj.last_quiz_date >= timezone.localdate() - timedelta(days=1):
+            return obj.current_streak
+        return 0
+
+    def get_categories(self, obj):
+        if obj.pk is None:
+            return []
+        return CategoryProgressSerializer(obj.categories.all(), many=True).data
@@ -1,3 +1,216 @@
+from datetime import timedelta
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from dictionary.models import Category, Word, Sentence, Translation, WordCategory
+from spanglish.instrumentation import query_budget
+from .sampling import sample_ids
+from .scheduling import due_queryset
+from .models import Quiz, QuizQuestion, ReviewState
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite-specific")
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user('learner')
+        quizzes = Quiz.objects.bulk_create(Quiz(user=user, total_questions=10) for _ in range(500))
+        word_ct = ContentType.objects.get_for_model(Word)
+        QuizQuestion.objects.bulk_create(
+            QuizQuestion(quiz=quiz, content_type=word_ct, object_id=i, correct_answer={}, is_correct=i % 3 == 0)
+            for quiz in quizzes
+            for i in range(10)
+        )
+        cls.quiz = quizzes[0]
+        ReviewState.objects.bulk_create(
+            ReviewState(user=user, content_type=word_ct, object_id=i, due_at=quizzes[0].created_at + timedelta(hours=i))
+            for i in range(5000)
+        )
+        cls.user = user
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_correct_questions_of_a_quiz(self):
+        plan = QuizQuestion.objects.filter(quiz=self.quiz, is_correct=True).explain()
+        self.assertIn("USING INDEX quizquestion_quiz_correct_idx", plan)
+
+    def test_due_reviews(self):
+        plan = due_queryset(self.user, [Word, Sentence])[:10].explain()
+        self.assertIn("USING INDEX reviewstate_user_due_idx", plan)
+
+
+class QuizQueryTests(TestCase):
+    """Serializing quizzes costs the same number of queries however many questions they have."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('learner')
+        words = Word.objects.bulk_create(Word(text=f'palabra{i}', category=WordCategory.NOUN) for i in range(20))
+        sentences = Sentence.objects.bulk_create(Sentence(text=f'Frase {i}.') for i in range(20))
+        content_types = ContentType.objects.get_for_models(Word, Sentence)
+        quizzes = Quiz.objects.bulk_create(Quiz(user=cls.user, total_questions=40) for _ in range(3))
+        QuizQuestion.objects.bulk_create(
+            QuizQuestion(quiz=quiz, content_type=content_types[type(item)], object_id=item.pk, correct_answer={})
+            for quiz in quizzes
+            for item in words + sentences
+        )
+        cls.quiz = quizzes[0]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_list(self):
+        # session, user, quizzes, questions, words, sentences
+        with query_budget(6):
+            response = self.client.get('/quiz/quiz/')
+        questions = response.json()['results'][0]['questions']
+        self.assertEqual(len(questions), 40)
+        self.assertEqual(questions[0]['text'], 'palabra0')
+
+    def test_detail(self):
+        with query_budget(6):
+            response = self.client.get(f'/quiz/quiz/{self.quiz.pk}/')
+        self.assertEqual(response.json()['questions'][-1]['text'], 'Frase 19.')
+
+
+class ProgressTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('learner')
+        basics = Category.objects.create(name='basics')
+        cls.words = Word.objects.bulk_create(
+            Word(text=f'palabra{i}', category=WordCategory.NOUN if i % 2 else WordCategory.ADJECTIVE)
+            for i in range(4)
+        )
+        basics.words.add(*cls.words[:2])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def submit_quiz(self, correct):
+        """Submit a quiz over all four words, answering the first `correct` of them right."""
+        word_ct = ContentType.objects.get_for_model(Word)
+        quiz = Quiz.objects.create(user=self.user, total_questions=len(self.words))
+        questions = QuizQuestion.objects.bulk_create(
+            QuizQuestion(quiz=quiz, content_type=word_ct, object_id=word.pk, correct_answer={'spanish': word.text})
+            for word in self.words
+        )
+        answers = [
+            {'question_id': q.pk, 'user_answer': {'spanish': q.correct_answer['spanish'] if i < correct else '?'}}
+            for i, q in enumerate(questions)
+        ]
+        response = self.client.post(f'/quiz/quiz/{quiz.pk}/submit/', {'answers': answers}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_stats(self):
+        self.submit_quiz(correct=4)
+        self.submit_quiz(correct=1)
+        stats = self.client.get('/quiz/quiz/stats/').json()
+        self.assertEqual(stats['quizzes_taken'], 2)
+        self.assertEqual(stats['questions_answered'], 8)
+        self.assertEqual(stats['correct_answers'], 5)
+        self.assertAlmostEqual(stats['rolling_accuracy'], 0.85)
+        self.assertEqual(stats['current_streak'], 1)
+        categories = {(row['kind'], row['key']): (row['answered'], row['correct']) for row in stats['categories']}
+        self.assertEqual(categories, {
+            ('category', 'basics'): (4, 3),
+            ('word_category', 'adj'): (4, 3),
+            ('word_category', 'noun'): (4, 2),
+        })
+
+    def test_stats_without_history(self):
+        stats = self.client.get('/quiz/quiz/stats/').json()
+        self.assertEqual((stats['quizzes_taken'], stats['categories']), (0, []))
+
+    def test_quizzes_are_scoped_to_the_user(self):
+        other = get_user_model().objects.create_user('other')
+        Quiz.objects.create(user=other)
+        self.submit_quiz(correct=0)
+        self.assertEqual(len(self.client.get('/quiz/quiz/').json()['results']), 1)
+
+    def test_review_schedule(self):
+        self.submit_quiz(correct=2)
+        self.submit_quiz(correct=1)
+        states = {s.object_id: s for s in ReviewState.objects.filter(user=self.user)}
+        self.assertEqual(len(states), 4)
+        first, second, third = (states[word.pk] for word in self.words[:3])
+        self.assertEqual((first.repetitions, first.interval), (2, 6))
+        self.assertEqual((second.repetitions, second.interval), (0, 1))
+        self.assertLess(second.ease, first.ease)
+        self.assertEqual(third.due_at - third.last_reviewed_at, timedelta(days=1))
+
+    def test_due_mode(self):
+        self.submit_quiz(correct=2)
+        ReviewState.objects.filter(object_id=self.words[3].pk).update(due_at=timezone.now() - timedelta(days=1))
+        response = self.client.post('/quiz/quiz/create_quiz/', {'count': 2, 'mode': 'due'}, content_type='application/json')
+        texts = [q['text'] for q in response.json()['questions']]
+        self.assertEqual(len(texts), 2)
+        self.assertIn('palabra3', texts)
+
+    def test_admin_changelists(self):
+        self.submit_quiz(correct=2)
+        self.submit_quiz(correct=3)
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret'))
+        for model in ('quiz', 'quizquestion', 'userprogress', 'reviewstate'):
+            # Users, quizzes and the generic question targets are joined or prefetched, not read per row
+            with query_budget(6):
+                response = self.client.get(f'/admin/quiz/{model}/')
+            self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'palabra3')
+        progress = self.user.progress
+        self.assertContains(self.client.get(f'/admin/quiz/userprogress/{progress.pk}/change/'), 'basics')
+
+
+class QuizCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('learner')
+        cls.words = Word.objects.bulk_create(Word(text=f'word{i}') for i in range(200))
+        rare = Category.objects.create(name='rare')
+        # A narrow filter spread over the whole id range, too sparse for random probes
+        rare.words.add(*cls.words[::40])
+        cls.rare = rare
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_quiz(self, **data):
+        return self.client.post('/quiz/quiz/create_quiz/', data, content_type='application/json')
+
+    def test_count_bounds(self):
+        for count in (0, -1, 101):
+            self.assertEqual(self.create_quiz(count=count).status_code, 400, count)
+        self.assertEqual(len(self.create_quiz(count=3).json()['questions']), 3)
+
+    def test_answer_is_the_spanish_text(self):
+        word = self.words[0]
+        Word.objects.exclude(pk=word.pk).delete()
+        Word.objects.create(text='')
+        Translation.objects.create(content_object=word, language='en', text='house')
+        response = self.create_quiz(count=5).json()
+        self.assertEqual([q['correct_answer'] for q in response['questions']], [{'spanish': 'word0'}])
+
+    def test_blank_answers_are_wrong(self):
+        quiz = Quiz.objects.create(user=self.user, total_questions=2)
+        word_ct = ContentType.objects.get_for_model(Word)
+        blank, real = QuizQuestion.objects.bulk_create([
+            QuizQuestion(quiz=quiz, content_type=word_ct, object_id=self.words[0].pk, correct_answer={'spanish': ''}),
+            QuizQuestion(quiz=quiz, content_type=word_ct, object_id=self.words[1].pk, correct_answer={'spanish': 'word1'}),
+        ])
+        answers = [{'question_id': blank.pk, 'user_answer': {}}, {'question_id': real.pk, 'user_answer': {'spanish': ''}}]
+        response = self.client.post(f'/quiz/quiz/{quiz.pk}/submit/', {'answers': answers}, content_type='application/json')
+        self.assertEqual(response.json()['score'], 0)
+        self.assertFalse(QuizQuestion.objects.filter(quiz=quiz, is_correct=True).exists())
+
+    def test_sparse_sample(self):
+        queryset = Word.objects.filter(categories=self.rare)
+        expected = {word.pk for word in self.words[::40]}
+        # An aggregate, the random probes and one read of the remaining ids
+        with query_budget(5):
+            picked = sample_ids(queryset, 4)
+        self.assertEqual(len(picked), 4)
+        self.assertLessEqual(set(picked), expected)
+        self.assertEqual(set(sample_ids(queryset, 10)), expected)
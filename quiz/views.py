@@ -1,20 +1,31 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Quiz
-from .serializers import QuizSerializer, QuizCreateSerializer, QuizSubmitSerializer
+from .models import Quiz, QuizQuestion, UserProgress, CategoryProgress
+from .serializers import QuizSerializer, QuizCreateSerializer, QuizSubmitSerializer, UserProgressSerializer
+
+
+def questions_prefetch():
+    """Prefetch questions and their Word/Sentence targets, one query per content type."""
+    return Prefetch('questions', queryset=QuizQuestion.objects.prefetch_related('content_object').order_by('pk'))
+
 
 class QuizViewSet(viewsets.ModelViewSet):
-    queryset = Quiz.objects.all()
+    queryset = Quiz.objects.prefetch_related(questions_prefetch())
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
     @action(detail=False, methods=['post'])
     def create_quiz(self, request):
         serializer = QuizCreateSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         quiz = serializer.save()
+        quiz = self.get_queryset().get(pk=quiz.pk)
         return Response(QuizSerializer(quiz).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
@@ -24,3 +35,9 @@ class QuizViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         quiz = serializer.save()
         return Response(QuizSerializer(quiz).data)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        categories = Prefetch('categories', queryset=CategoryProgress.objects.order_by('kind', 'key'))
+        progress = UserProgress.objects.prefetch_related(categories).filter(user=request.user).first()
+        return Response(UserProgressSerializer(progress or UserProgress(user=request.user)).data)
@@ -0,0 +1,3 @@
+# Connect the connection-setup signal handlers (SQLite PRAGMAs, query
+# instrumentation) as soon as the project loads.
+from . import instrumentation, sqlite  # noqa: F401
@@ -0,0 +1,27 @@
+"""
+Admin defaults shared by the dictionary and quiz apps.
+
+Their tables grow to millions of rows, where the stock changelist counts the
+whole table twice per page and resolves generic foreign keys one row at a time.
+"""
+from django.contrib import admin
+from .pagination import EstimatedCountPaginator
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for large tables: estimated page counts instead of COUNT(*) of the
+    whole table, and the GenericForeignKeys named in `prefetch_generic` loaded with
+    one query per content type instead of one per row.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # The changelist's default order, made explicit so autocomplete results page consistently
+    ordering = ('-pk',)
+    prefetch_generic = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.prefetch_generic:
+            queryset = queryset.prefetch_related(*self.prefetch_generic)
+        return queryset
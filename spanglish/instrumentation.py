@@ -0,0 +1,137 @@
+"""
+Per-request SQL instrumentation.
+
+Every database connection gets one execute wrapper when it is created, which
+reports each query to the `QueryStats` active in the current context. Context
+variables follow `sync_to_async`, so the queries an async view runs on a
+worker thread's connection are counted like those of a sync view.
+
+`QueryInstrumentationMiddleware` activates a `QueryStats` for the duration of
+a request. It reports the query count and database time in a `Server-Timing`
+header, and logs a warning when the same statement (literals and parameters
+stripped) runs more than `settings.SQL_REPEAT_THRESHOLD` times, which is the
+signature of an N+1 loop. `query_budget()` gives tests the same counter as an
+assertion.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_VALUE_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+
+# (QueryStats, aliases or None for all) pairs collecting the queries of the current context
+_active = ContextVar('spanglish_query_stats', default=())
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape: literals, placeholders and IN (...) lists become `?`."""
+    return _VALUE_LISTS.sub('(?)', _LITERALS.sub('?', sql))
+
+
+class QueryStats:
+    """Counts queries, their total time and repeated statements."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def add(self, sql, duration):
+        self.duration += duration
+        self.count += 1
+        self.statements[normalize_sql(sql)] += 1
+
+    def repeated(self, threshold):
+        """Statements that ran more than `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper reporting the query to every QueryStats active in the current context."""
+    active = _active.get()
+    if not active:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        alias = context['connection'].alias
+        for stats, aliases in active:
+            if aliases is None or alias in aliases:
+                stats.add(sql, duration)
+
+
+def install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created, dispatch_uid='spanglish-query-instrumentation')
+def install_on_connect(sender, connection, **kwargs):
+    install(connection)
+
+
+@contextmanager
+def capture_queries(aliases=None):
+    """Count the queries run on the given connections (all of them by default) inside the block."""
+    stats = QueryStats()
+    # Connections opened before this module was loaded missed the signal
+    for alias in aliases or connections:
+        install(connections[alias])
+    token = _active.set((*_active.get(), (stats, set(aliases) if aliases else None)))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries, aliases=None):
+    """Fail with the offending statements if the block runs more than `max_queries` queries."""
+    with capture_queries(aliases) as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = '\n'.join(f"  {n}x {sql}" for sql, n in stats.statements.most_common())
+        raise AssertionError(f"{stats.count} queries executed, budget was {max_queries}:\n{statements}")
+
+
+def report(request, response, stats):
+    duration = stats.duration * 1000
+    timing = f'db;dur={duration:.1f};desc="{stats.count} queries"'
+    if response.has_header('Server-Timing'):
+        timing = f"{response['Server-Timing']}, {timing}"
+    response['Server-Timing'] = timing
+
+    threshold = getattr(settings, 'SQL_REPEAT_THRESHOLD', 10)
+    for sql, n in stats.repeated(threshold):
+        logger.warning("%s %s ran the same query %d times (possible N+1): %s", request.method, request.path, n, sql)
+    return response
+
+
+@sync_and_async_middleware
+def QueryInstrumentationMiddleware(get_response):
+    """Instrument every query of the request (the body of a streaming response is not included)."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with capture_queries() as stats:
+                response = await get_response(request)
+            return report(request, response, stats)
+    else:
+        def middleware(request):
+            with capture_queries() as stats:
+                response = get_response(request)
+            return report(request, response, stats)
+    return middleware
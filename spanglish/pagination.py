@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over the primary key.
+
+    Each page is a `WHERE id > <cursor> ORDER BY id LIMIT n` range read, so deep pages
+    cost the same as the first one. Clients may ask for `?page_size=`, capped at
+    `settings.MAX_PAGE_SIZE`.
+    """
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 200)
+
+
+def estimated_count(queryset):
+    """
+    Row count of the table behind an unfiltered `queryset` without scanning it: the
+    planner's estimate on PostgreSQL, otherwise the highest primary key (exact
+    until rows are deleted). None when no estimate is available.
+    """
+    model, using = queryset.model, queryset.db
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    if model._meta.pk.get_internal_type() not in ('AutoField', 'BigAutoField', 'SmallAutoField'):
+        return None
+    return model._default_manager.using(using).aggregate(last=Max('pk'))['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over tables too large to COUNT(*) on every page.
+
+    An unfiltered list uses `estimated_count()` once the table holds more than
+    `max_exact_count` rows; filtered lists (searches, list filters) are counted
+    exactly, since their filters narrow the scan. Pair it with
+    `show_full_result_count = False` so the admin does not count the table anyway.
+    """
+    max_exact_count = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct and not query.combinator:
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate > self.max_exact_count:
+                return estimate
+        return super().count
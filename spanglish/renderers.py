@@ -0,0 +1,33 @@
+"""
+JSON renderer backed by orjson when it is installed (`pip install .[fast]`).
+
+orjson encodes the dicts and lists the API returns several times faster than
+the standard library. `FastJSONRenderer` writes the same bytes as DRF's
+`JSONRenderer` (compact separators, UTF-8, U+2028/U+2029 escaped, the same
+encoding of dates, decimals and lazy strings) except for floats: orjson's
+shortest round-trip form can spell very small or large values differently
+(0.00001 where Python writes 1e-05) and renders NaN and infinity as null
+instead of raising. Indented output, non-default JSON settings and values
+orjson cannot encode go to `JSONRenderer`, as does everything when orjson is
+not installed.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,76 @@
+"""
+Primary/replica database routing.
+
+Reads of `dictionary` models are spread over the aliases in
+`settings.DATABASE_REPLICAS`; every write, and all other apps (quiz, auth,
+sessions, ...), use the primary `default` database. Requests with a non-safe
+method read from the primary from the start, so the reads their writes depend on
+are never stale; other requests move to the primary once they route a write, so
+they always see their own writes. `ReplicaPinningMiddleware` scopes that
+stickiness to a single request.
+"""
+import random
+from asgiref.sync import iscoroutinefunction
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICATED_APPS = {'dictionary'}
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+def is_pinned():
+    """Whether the current request reads from the primary."""
+    return _pinned_to_primary.get()
+
+
+@contextmanager
+def primary():
+    """Send every read in the block to the primary, e.g. for reads that must be consistent."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if replicas and model._meta.app_label in REPLICATED_APPS and not _pinned_to_primary.get():
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _pinned_to_primary.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary, so every object lives in the same dataset
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
+
+
+@sync_and_async_middleware
+def ReplicaPinningMiddleware(get_response):
+    """Pin non-safe requests from their start, and forget the pin when the request ends."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _pinned_to_primary.set(request.method not in SAFE_METHODS)
+            try:
+                return await get_response(request)
+            finally:
+                _pinned_to_primary.reset(token)
+    else:
+        def middleware(request):
+            token = _pinned_to_primary.set(request.method not in SAFE_METHODS)
+            try:
+                return get_response(request)
+            finally:
+                _pinned_to_primary.reset(token)
+    return middleware
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'spanglish.instrumentation.QueryInstrumentationMiddleware',
+    'spanglish.routers.ReplicaPinningMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,9 +88,94 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests; set to 0 when serving through ASGI
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts instead of on its first write
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Read replicas for the dictionary app, as a comma-separated list of read-only
+# SQLite copies of the primary, e.g. DJANGO_READ_REPLICAS=/data/replica1.sqlite3.
+# Other backends (e.g. a Postgres standby) can be added to DATABASES directly
+# and listed in DATABASE_REPLICAS.
+DATABASE_REPLICAS = []
+for index, path in enumerate(filter(None, os.environ.get('DJANGO_READ_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{path}?mode=ro',
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['spanglish.routers.PrimaryReplicaRouter']
+
+# Applied to every new SQLite connection by spanglish.sqlite
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,             # milliseconds
+    'mmap_size': 256 * 1024 * 1024,   # bytes
+    'cache_size': -64 * 1024,         # negative means KiB
+    'temp_store': 'MEMORY',
+}
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'spanglish.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # orjson-backed when it is installed, otherwise the stock JSON renderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'spanglish.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Upper bound for the `?page_size=` query parameter on list endpoints
+MAX_PAGE_SIZE = 200
+
+# Log a warning when one request runs the same SQL statement more than this many times
+SQL_REPEAT_THRESHOLD = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The dictionary version stamps live here, so every worker process (and both
+# compose services) must share it: a directory by default (DJANGO_CACHE_DIR), or
+# e.g. Redis. The test runner swaps in a per-process LocMemCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
+# Keeps the test suite off the shared cache above
+TEST_RUNNER = 'spanglish.test.IsolatedCacheRunner'
+
+# Cache alias and lifetime (seconds) for versioned dictionary responses
+DICTIONARY_CACHE_ALIAS = 'default'
+DICTIONARY_CACHE_TIMEOUT = 60 * 60
+
+# Serve word, sentence and translation lists from values() rows instead of serializers
+DICTIONARY_FAST_LISTS = True
+
+# Where offline dictionary packs (/dictionary/export/) are cached
+DICTIONARY_EXPORT_DIR = BASE_DIR / 'exports'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
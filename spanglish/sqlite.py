@@ -0,0 +1,34 @@
+"""
+SQLite connection profile.
+
+Every new SQLite connection gets the PRAGMAs listed in `settings.SQLITE_PRAGMAS`
+(WAL journal, relaxed fsync, busy timeout, mmap and page cache size). Persistent
+connections come from `CONN_MAX_AGE` and write transactions start with
+`BEGIN IMMEDIATE` through the backend's `transaction_mode` option, so concurrent
+writers queue on the busy timeout instead of failing with "database is locked"
+when a deferred read transaction tries to upgrade.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# journal_mode is a property of the database file and cannot be changed
+# through a read-only connection.
+WRITE_ONLY_PRAGMAS = {'journal_mode'}
+
+
+def is_read_only(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+@receiver(connection_created, dispatch_uid='spanglish-sqlite-pragmas')
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if read_only and name in WRITE_ONLY_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,47 @@
+"""
+Test runner that keeps the suite off the configured cache.
+
+The default cache is a directory shared by every server process, so tests that
+call `cache.clear()` would wipe a developer's running cache, and parallel test
+processes would see each other's entries. Each test process gets its own
+LocMemCache instead.
+"""
+import django
+from django.test import override_settings
+from django.test.runner import DiscoverRunner, ParallelTestSuite
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+def isolate_cache():
+    """Switch this process to TEST_CACHES; returns the override to disable later."""
+    cache_settings = override_settings(CACHES=TEST_CACHES)
+    cache_settings.enable()
+    return cache_settings
+
+
+def isolate_worker_cache():
+    # Runs before the worker sets Django up, and the override needs loaded settings
+    django.setup()
+    isolate_cache()
+
+
+class IsolatedCacheSuite(ParallelTestSuite):
+    # Spawned workers don't inherit the runner's override
+    process_setup = isolate_worker_cache
+
+
+class IsolatedCacheRunner(DiscoverRunner):
+    parallel_test_suite = IsolatedCacheSuite
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_settings = isolate_cache()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        super().teardown_test_environment(**kwargs)